@@ -0,0 +1,51 @@
+"""Service rating aggregates
+
+Adds review count, sum, average and per-star counts to services, backfilled
+from existing reviews, plus an index for ordering by average rating.
+
+Revision ID: 5b0e7f3c91d2
+Revises: c752d6804e95
+Create Date: 2026-10-16 12:05:13.874120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b0e7f3c91d2'
+down_revision = 'c752d6804e95'
+branch_labels = None
+depends_on = None
+
+RATING_COLUMNS = ['rating_count', 'rating_sum'] + [f'rating_{rating}_count' for rating in range(1, 6)]
+
+
+def upgrade() -> None:
+    for name in RATING_COLUMNS:
+        op.add_column('services', sa.Column(name, sa.Integer(), server_default='0', nullable=False))
+    op.add_column('services', sa.Column('rating_average', sa.Float(), server_default='0', nullable=False))
+    
+    service_reviews = (
+        "FROM reviews JOIN bookings ON bookings.id = reviews.booking_id "
+        "WHERE bookings.service_id = services.id"
+    )
+    histogram = ", ".join(
+        f"rating_{rating}_count = (SELECT count(*) {service_reviews} AND reviews.rating = {rating})"
+        for rating in range(1, 6)
+    )
+    op.execute(
+        f"UPDATE services SET "
+        f"rating_count = (SELECT count(*) {service_reviews}), "
+        f"rating_sum = (SELECT coalesce(sum(reviews.rating), 0) {service_reviews}), "
+        f"rating_average = (SELECT coalesce(avg(reviews.rating), 0) {service_reviews}), "
+        f"{histogram}"
+    )
+    op.create_index('idx_service_rating_id', 'services', ['rating_average', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_service_rating_id', table_name='services')
+    op.drop_column('services', 'rating_average')
+    for name in reversed(RATING_COLUMNS):
+        op.drop_column('services', name)
@@ -0,0 +1,36 @@
+"""Booking overlap exclusion constraint
+
+Active (pending/confirmed) bookings of the same service may not overlap.
+Existing overlapping active bookings must be resolved before upgrading.
+
+Revision ID: 8c5bca2429ce
+Revises: e35393b54e5a
+Create Date: 2026-10-16 10:03:27.551930
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c5bca2429ce'
+down_revision = 'e35393b54e5a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    op.execute(
+        "ALTER TABLE bookings ADD CONSTRAINT excl_booking_service_overlap "
+        "EXCLUDE USING gist (service_id WITH =, tsrange(start_time, end_time) WITH &&) "
+        "WHERE (status IN ('PENDING', 'CONFIRMED'))"
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_constraint('excl_booking_service_overlap', 'bookings', type_='exclude')
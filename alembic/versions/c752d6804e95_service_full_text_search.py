@@ -0,0 +1,64 @@
+"""Service full-text search
+
+Postgres gets a generated, GIN-indexed tsvector column over title (weight A)
+and description (weight B). SQLite gets an external-content FTS5 table kept
+in sync by triggers.
+
+Revision ID: c752d6804e95
+Revises: 8c5bca2429ce
+Create Date: 2026-10-16 11:20:41.208316
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c752d6804e95'
+down_revision = '8c5bca2429ce'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.execute(
+            "ALTER TABLE services ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+            "setweight(to_tsvector('english', title), 'A') || "
+            "setweight(to_tsvector('english', description), 'B')) STORED"
+        )
+        op.execute('CREATE INDEX idx_service_search_vector ON services USING gin (search_vector)')
+    elif dialect == 'sqlite':
+        op.execute(
+            "CREATE VIRTUAL TABLE services_fts USING fts5("
+            "title, description, content='services', content_rowid='id', tokenize='porter unicode61')"
+        )
+        op.execute(
+            "CREATE TRIGGER services_fts_insert AFTER INSERT ON services BEGIN "
+            "INSERT INTO services_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER services_fts_delete AFTER DELETE ON services BEGIN "
+            "INSERT INTO services_fts(services_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); END"
+        )
+        op.execute(
+            "CREATE TRIGGER services_fts_update AFTER UPDATE OF title, description ON services BEGIN "
+            "INSERT INTO services_fts(services_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            "INSERT INTO services_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END"
+        )
+        op.execute("INSERT INTO services_fts(services_fts) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    if dialect == 'postgresql':
+        op.drop_index('idx_service_search_vector', table_name='services')
+        op.drop_column('services', 'search_vector')
+    elif dialect == 'sqlite':
+        op.execute('DROP TRIGGER services_fts_update')
+        op.execute('DROP TRIGGER services_fts_delete')
+        op.execute('DROP TRIGGER services_fts_insert')
+        op.execute('DROP TABLE services_fts')
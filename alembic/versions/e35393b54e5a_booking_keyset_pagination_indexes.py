@@ -0,0 +1,26 @@
+"""Booking keyset pagination indexes
+
+Revision ID: e35393b54e5a
+Revises: a0425ae16c91
+Create Date: 2026-10-16 09:12:40.118502
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e35393b54e5a'
+down_revision = 'a0425ae16c91'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_booking_start_id', 'bookings', ['start_time', 'id'], unique=False)
+    op.create_index('idx_booking_user_start_id', 'bookings', ['user_id', 'start_time', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_booking_user_start_id', table_name='bookings')
+    op.drop_index('idx_booking_start_id', table_name='bookings')
@@ -0,0 +1,63 @@
+"""Booking series
+
+Recurring booking series, and the series each materialized booking belongs to.
+
+Revision ID: f4a81c2d6e07
+Revises: 5b0e7f3c91d2
+Create Date: 2026-10-16 13:42:08.513927
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a81c2d6e07'
+down_revision = '5b0e7f3c91d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('booking_series',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('service_id', sa.Integer(), nullable=False),
+    sa.Column('start_time', sa.DateTime(), nullable=False),
+    sa.Column('duration_minutes', sa.Integer(), nullable=False),
+    sa.Column('frequency', sa.Enum('DAILY', 'WEEKLY', name='recurrencefrequency'), nullable=False),
+    sa.Column('interval', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=True),
+    sa.Column('until', sa.DateTime(), nullable=True),
+    sa.Column('materialized_until', sa.DateTime(), nullable=False),
+    sa.Column('is_active', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.CheckConstraint('interval > 0', name='check_series_interval_positive'),
+    sa.ForeignKeyConstraint(['service_id'], ['services.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_booking_series_id'), 'booking_series', ['id'], unique=False)
+    op.create_index(op.f('ix_booking_series_materialized_until'), 'booking_series', ['materialized_until'], unique=False)
+    op.create_index(op.f('ix_booking_series_service_id'), 'booking_series', ['service_id'], unique=False)
+    op.create_index(op.f('ix_booking_series_user_id'), 'booking_series', ['user_id'], unique=False)
+    
+    # Batch mode lets SQLite add the foreign key by rebuilding the table
+    with op.batch_alter_table('bookings') as batch_op:
+        batch_op.add_column(sa.Column('series_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_bookings_series_id', 'booking_series', ['series_id'], ['id'])
+    op.create_index(op.f('ix_bookings_series_id'), 'bookings', ['series_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_bookings_series_id'), table_name='bookings')
+    with op.batch_alter_table('bookings') as batch_op:
+        batch_op.drop_constraint('fk_bookings_series_id', type_='foreignkey')
+        batch_op.drop_column('series_id')
+    
+    op.drop_index(op.f('ix_booking_series_user_id'), table_name='booking_series')
+    op.drop_index(op.f('ix_booking_series_service_id'), table_name='booking_series')
+    op.drop_index(op.f('ix_booking_series_materialized_until'), table_name='booking_series')
+    op.drop_index(op.f('ix_booking_series_id'), table_name='booking_series')
+    op.drop_table('booking_series')
+    sa.Enum(name='recurrencefrequency').drop(op.get_bind(), checkfirst=True)
@@ -1,21 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
-from app.core.security import hash_password, verify_password, create_access_token, create_refresh_token, decode_token
+from app.core.database import get_async_db
+from app.core.security import password_hasher, PasswordHasherBusy, create_access_token, create_refresh_token, decode_token
+from app.core.unit_of_work import UnitOfWorkRoute
 from app.repositories.user_repository import UserRepository
 from app.schemas.schemas import UserRegister, UserLogin, Token, TokenRefresh, UserResponse
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
+
+
+def hasher_busy_error() -> HTTPException:
+    """503 returned when the password hashing pool is saturated"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many authentication requests, please retry shortly",
+        headers={"Retry-After": "1"},
+    )
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegister, db: Session = Depends(get_db)):
+async def register(user_data: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """Register a new user"""
     user_repo = UserRepository(db)
     
     # Check if user already exists
-    existing_user = user_repo.get_by_email(user_data.email)
+    existing_user = await user_repo.get_by_email(user_data.email)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -23,20 +33,28 @@ async def register(user_data: UserRegister, db: Session = Depends(get_db)):
         )
     
     # Hash password and create user
-    password_hash = hash_password(user_data.password)
-    user = user_repo.create(user_data, password_hash)
+    try:
+        password_hash = await password_hasher.hash(user_data.password)
+    except PasswordHasherBusy:
+        raise hasher_busy_error()
+    user = await user_repo.create(user_data, password_hash)
     
     return user
 
 
 @router.post("/login", response_model=Token)
-async def login(user_data: UserLogin, db: Session = Depends(get_db)):
+async def login(user_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Login and get access tokens"""
     user_repo = UserRepository(db)
     
     # Get user by email
-    user = user_repo.get_by_email(user_data.email)
-    if not user or not verify_password(user_data.password, user.password_hash):
+    user = await user_repo.get_by_email(user_data.email)
+    try:
+        password_valid = user is not None and await password_hasher.verify(user_data.password, user.password_hash)
+    except PasswordHasherBusy:
+        raise hasher_busy_error()
+    
+    if not password_valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -44,8 +62,8 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
         )
     
     # Create tokens
-    access_token = create_access_token(data={"sub": user.id})
-    refresh_token = create_refresh_token(data={"sub": user.id})
+    access_token = create_access_token(data={"sub": str(user.id)})
+    refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
     return {
         "access_token": access_token,
@@ -55,7 +73,7 @@ async def login(user_data: UserLogin, db: Session = Depends(get_db)):
 
 
 @router.post("/refresh", response_model=Token)
-async def refresh(token_data: TokenRefresh, db: Session = Depends(get_db)):
+async def refresh(token_data: TokenRefresh, db: AsyncSession = Depends(get_async_db)):
     """Refresh access token using refresh token"""
     payload = decode_token(token_data.refresh_token)
     
@@ -76,7 +94,7 @@ async def refresh(token_data: TokenRefresh, db: Session = Depends(get_db)):
     
     # Verify user exists
     user_repo = UserRepository(db)
-    user = user_repo.get_by_id(user_id)
+    user = await user_repo.get_by_id(int(user_id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -84,8 +102,8 @@ async def refresh(token_data: TokenRefresh, db: Session = Depends(get_db)):
         )
     
     # Create new tokens
-    access_token = create_access_token(data={"sub": user.id})
-    refresh_token = create_refresh_token(data={"sub": user.id})
+    access_token = create_access_token(data={"sub": str(user.id)})
+    refresh_token = create_refresh_token(data={"sub": str(user.id)})
     
     return {
         "access_token": access_token,
@@ -1,30 +1,52 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
 from datetime import datetime, timedelta
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.dependencies import get_current_user, require_admin
-from app.repositories.booking_repository import BookingRepository
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, build_page, decode_cursor
+from app.core.replicas import get_read_db
+from app.core.response_cache import dump_rows
+from app.core.unit_of_work import UnitOfWorkRoute
+from app.repositories.booking_repository import BookingRepository, BookingConflictError, ServiceLoading, EXPORT_COLUMNS
 from app.repositories.service_repository import ServiceRepository
-from app.schemas.schemas import BookingCreate, BookingUpdate, BookingResponse, BookingStatus
-from app.models.models import User, UserRole
+from app.schemas.schemas import (
+    BookingCreate, BookingUpdate, BookingResponse, BookingStatus, Page, UserPrincipal, ExportFormat,
+    BookingBulkCreate, BookingBulkResponse
+)
+from app.models.models import UserRole
+from app.services.export import csv_chunks, ndjson_chunks
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
+
+EXPORT_FORMATS = {
+    ExportFormat.NDJSON: (ndjson_chunks, "application/x-ndjson"),
+    ExportFormat.CSV: (csv_chunks, "text/csv"),
+}
+
+
+def booking_conflict_error() -> HTTPException:
+    """409 returned when a time slot overlaps an active booking"""
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="Booking conflict: time slot is not available"
+    )
 
 
 @router.post("", response_model=BookingResponse, status_code=status.HTTP_201_CREATED)
 async def create_booking(
     booking_data: BookingCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create new booking"""
     service_repo = ServiceRepository(db)
     booking_repo = BookingRepository(db)
     
     # Check if service exists and is active
-    service = service_repo.get_by_id(booking_data.service_id)
+    service = await service_repo.get_by_id(booking_data.service_id)
     if not service:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -40,63 +62,131 @@ async def create_booking(
     # Calculate end time based on service duration
     end_time = booking_data.start_time + timedelta(minutes=service.duration_minutes)
     
-    # Check for booking conflicts
-    has_conflict = booking_repo.check_conflict(
-        service_id=booking_data.service_id,
-        start_time=booking_data.start_time,
-        end_time=end_time
-    )
-    
-    if has_conflict:
-        raise HTTPException(
-            status_code=status.HTTP_409_CONFLICT,
-            detail="Booking conflict: time slot is not available"
+    # Create booking (conflicts are detected atomically with the insert)
+    try:
+        booking = await booking_repo.create(
+            user_id=current_user.id,
+            service_id=booking_data.service_id,
+            start_time=booking_data.start_time,
+            end_time=end_time
         )
-    
-    # Create booking
-    booking = booking_repo.create(
-        user_id=current_user.id,
-        service_id=booking_data.service_id,
-        start_time=booking_data.start_time,
-        end_time=end_time
-    )
+    except BookingConflictError:
+        raise booking_conflict_error()
     
     return booking
 
 
-@router.get("", response_model=List[BookingResponse])
+@router.post("/bulk", response_model=BookingBulkResponse)
+async def create_bookings_bulk(
+    bulk_data: BookingBulkCreate,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create many bookings at once, reporting each item's outcome
+    
+    Items are checked against existing bookings and against earlier items;
+    a conflicting item gets status_code 409 while the others are created.
+    """
+    service_repo = ServiceRepository(db)
+    booking_repo = BookingRepository(db)
+    
+    services = {
+        service.id: service
+        for service in await service_repo.get_by_ids(item.service_id for item in bulk_data.items)
+    }
+    
+    results = []
+    slots = []
+    for index, item in enumerate(bulk_data.items):
+        service = services.get(item.service_id)
+        if not service:
+            results.append({"index": index, "status_code": status.HTTP_404_NOT_FOUND, "detail": "Service not found"})
+        elif not service.is_active:
+            results.append({"index": index, "status_code": status.HTTP_400_BAD_REQUEST, "detail": "Service is not active"})
+        else:
+            end_time = item.start_time + timedelta(minutes=service.duration_minutes)
+            slots.append((index, (service.id, item.start_time, end_time)))
+    
+    try:
+        bookings = await booking_repo.create_many(current_user.id, [slot for _, slot in slots])
+    except BookingConflictError:
+        raise booking_conflict_error()
+    
+    for (index, _), booking in zip(slots, bookings):
+        if booking:
+            results.append({"index": index, "status_code": status.HTTP_201_CREATED, "booking": booking})
+        else:
+            results.append({"index": index, "status_code": status.HTTP_409_CONFLICT, "detail": booking_conflict_error().detail})
+    
+    results.sort(key=lambda result: result["index"])
+    return {"created": sum(1 for booking in bookings if booking), "results": results}
+
+
+@router.get("", response_model=Page[BookingResponse])
 async def get_bookings(
     status_filter: Optional[BookingStatus] = Query(None, alias="status"),
     from_date: Optional[datetime] = Query(None, alias="from"),
     to_date: Optional[datetime] = Query(None, alias="to"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get bookings (user: own bookings, admin: all bookings)"""
+    """Get bookings (user: own bookings, admin: all bookings), newest first"""
     booking_repo = BookingRepository(db)
+    after = decode_cursor(cursor, datetime, int) if cursor else None
     
     # Users can only see their own bookings, admins see all
     user_id = None if current_user.role == UserRole.ADMIN else current_user.id
     
-    bookings = booking_repo.get_all(
+    # BookingResponse-shaped dicts from one joined query, dumped without validation
+    bookings = await booking_repo.get_all_rows(
         user_id=user_id,
         status=status_filter,
         from_date=from_date,
-        to_date=to_date
+        to_date=to_date,
+        limit=limit,
+        after=after
     )
     
-    return bookings
+    page = build_page(bookings, limit, lambda booking: (booking["start_time"], booking["id"]))
+    return Response(content=dump_rows(page), media_type="application/json")
+
+
+@router.get("/export")
+async def export_bookings(
+    format: ExportFormat = Query(ExportFormat.NDJSON, description="ndjson or csv"),
+    status_filter: Optional[BookingStatus] = Query(None, alias="status"),
+    from_date: Optional[datetime] = Query(None, alias="from"),
+    to_date: Optional[datetime] = Query(None, alias="to"),
+    db: AsyncSession = Depends(get_read_db),
+    admin = Depends(require_admin)
+):
+    """Stream all matching bookings, oldest first (admin only)
+    
+    The session stays open until the body is sent: FastAPI closes yield
+    dependencies after the response.
+    """
+    booking_repo = BookingRepository(db)
+    batches = booking_repo.stream_for_export(status=status_filter, from_date=from_date, to_date=to_date)
+    render, media_type = EXPORT_FORMATS[format]
+    columns = [column.key for column in EXPORT_COLUMNS]
+    return StreamingResponse(
+        render(columns, batches),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="bookings.{format.value}"'}
+    )
 
 
 @router.get("/{booking_id}", response_model=BookingResponse)
 async def get_booking(
     booking_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Get booking by ID (owner or admin)"""
     booking_repo = BookingRepository(db)
-    booking = booking_repo.get_by_id(booking_id)
+    booking = await booking_repo.get_by_id(booking_id)
     
     if not booking:
         raise HTTPException(
@@ -118,14 +208,14 @@ async def get_booking(
 async def update_booking(
     booking_id: int,
     booking_data: BookingUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update booking (owner can reschedule/cancel, admin can update status)"""
     booking_repo = BookingRepository(db)
     service_repo = ServiceRepository(db)
     
-    booking = booking_repo.get_by_id(booking_id)
+    booking = await booking_repo.get_by_id(booking_id)
     if not booking:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -151,34 +241,26 @@ async def update_booking(
             )
         
         # Get service for duration calculation
-        service = service_repo.get_by_id(booking.service_id)
+        service = await service_repo.get_by_id(booking.service_id)
         new_end_time = booking_data.start_time + timedelta(minutes=service.duration_minutes)
         
-        # Check for conflicts
-        has_conflict = booking_repo.check_conflict(
-            service_id=booking.service_id,
-            start_time=booking_data.start_time,
-            end_time=new_end_time,
-            exclude_booking_id=booking.id
-        )
-        
-        if has_conflict:
-            raise HTTPException(
-                status_code=status.HTTP_409_CONFLICT,
-                detail="Booking conflict: time slot is not available"
+        try:
+            booking = await booking_repo.update(
+                booking,
+                start_time=booking_data.start_time,
+                end_time=new_end_time
             )
-        
-        booking = booking_repo.update(
-            booking,
-            start_time=booking_data.start_time,
-            end_time=new_end_time
-        )
+        except BookingConflictError:
+            raise booking_conflict_error()
     
     # Handle status update (admin only or owner cancelling)
     if booking_data.status:
         if is_admin:
-            # Admin can change to any status
-            booking = booking_repo.update(booking, status=booking_data.status)
+            # Admin can change to any status (reactivating may conflict)
+            try:
+                booking = await booking_repo.update(booking, status=booking_data.status)
+            except BookingConflictError:
+                raise booking_conflict_error()
         elif is_owner and booking_data.status == BookingStatus.CANCELLED:
             # Owner can only cancel
             if booking.status not in [BookingStatus.PENDING, BookingStatus.CONFIRMED]:
@@ -186,7 +268,7 @@ async def update_booking(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="Can only cancel pending or confirmed bookings"
                 )
-            booking = booking_repo.update(booking, status=BookingStatus.CANCELLED)
+            booking = await booking_repo.update(booking, status=BookingStatus.CANCELLED)
         else:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
@@ -199,12 +281,12 @@ async def update_booking(
 @router.delete("/{booking_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_booking(
     booking_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete booking (owner before start_time, admin anytime)"""
     booking_repo = BookingRepository(db)
-    booking = booking_repo.get_by_id(booking_id)
+    booking = await booking_repo.get_by_id(booking_id, service_loading=ServiceLoading.RAISE)
     
     if not booking:
         raise HTTPException(
@@ -229,5 +311,5 @@ async def delete_booking(
                 detail="Cannot delete booking after start time"
             )
     
-    booking_repo.delete(booking)
+    await booking_repo.delete(booking)
     return None
\ No newline at end of file
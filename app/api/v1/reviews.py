@@ -1,29 +1,31 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.dependencies import get_current_user, require_admin
+from app.core.replicas import get_read_db
+from app.core.unit_of_work import UnitOfWorkRoute
 from app.repositories.review_repository import ReviewRepository
-from app.repositories.booking_repository import BookingRepository
-from app.schemas.schemas import ReviewCreate, ReviewUpdate, ReviewResponse, BookingStatus
-from app.models.models import User, UserRole
+from app.repositories.booking_repository import BookingRepository, ServiceLoading
+from app.schemas.schemas import ReviewCreate, ReviewUpdate, ReviewResponse, BookingStatus, UserPrincipal
+from app.models.models import UserRole
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
 @router.post("", response_model=ReviewResponse, status_code=status.HTTP_201_CREATED)
 async def create_review(
     review_data: ReviewCreate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Create review (must be for completed booking by same user, one per booking)"""
     booking_repo = BookingRepository(db)
     review_repo = ReviewRepository(db)
     
     # Check if booking exists
-    booking = booking_repo.get_by_id(review_data.booking_id)
+    booking = await booking_repo.get_by_id(review_data.booking_id, service_loading=ServiceLoading.RAISE)
     if not booking:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -45,22 +47,22 @@ async def create_review(
         )
     
     # Check if review already exists
-    existing_review = review_repo.get_by_booking_id(review_data.booking_id)
+    existing_review = await review_repo.get_by_booking_id(review_data.booking_id)
     if existing_review:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Review already exists for this booking"
         )
     
-    review = review_repo.create(review_data)
+    review = await review_repo.create(review_data)
     return review
 
 
 @router.get("/{review_id}", response_model=ReviewResponse)
-async def get_review(review_id: int, db: Session = Depends(get_db)):
+async def get_review(review_id: int, db: AsyncSession = Depends(get_read_db)):
     """Get review by ID (public endpoint)"""
     review_repo = ReviewRepository(db)
-    review = review_repo.get_by_id(review_id)
+    review = await review_repo.get_by_id(review_id)
     
     if not review:
         raise HTTPException(
@@ -75,14 +77,14 @@ async def get_review(review_id: int, db: Session = Depends(get_db)):
 async def update_review(
     review_id: int,
     review_data: ReviewUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update review (owner only)"""
     review_repo = ReviewRepository(db)
     booking_repo = BookingRepository(db)
     
-    review = review_repo.get_by_id(review_id)
+    review = await review_repo.get_by_id(review_id)
     if not review:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -90,28 +92,28 @@ async def update_review(
         )
     
     # Check if user owns the booking
-    booking = booking_repo.get_by_id(review.booking_id)
+    booking = await booking_repo.get_by_id(review.booking_id, service_loading=ServiceLoading.RAISE)
     if booking.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to update this review"
         )
     
-    updated_review = review_repo.update(review, review_data)
+    updated_review = await review_repo.update(review, review_data)
     return updated_review
 
 
 @router.delete("/{review_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_review(
     review_id: int,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Delete review (owner or admin)"""
     review_repo = ReviewRepository(db)
     booking_repo = BookingRepository(db)
     
-    review = review_repo.get_by_id(review_id)
+    review = await review_repo.get_by_id(review_id)
     if not review:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -119,7 +121,7 @@ async def delete_review(
         )
     
     # Check authorization
-    booking = booking_repo.get_by_id(review.booking_id)
+    booking = await booking_repo.get_by_id(review.booking_id, service_loading=ServiceLoading.RAISE)
     is_owner = booking.user_id == current_user.id
     is_admin = current_user.role == UserRole.ADMIN
     
@@ -129,5 +131,5 @@ async def delete_review(
             detail="Not authorized to delete this review"
         )
     
-    review_repo.delete(review)
+    await review_repo.delete(review)
     return None
\ No newline at end of file
@@ -0,0 +1,155 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import timedelta
+
+from app.core.database import get_async_db
+from app.core.dependencies import get_current_user, require_admin
+from app.core.unit_of_work import UnitOfWorkRoute, commit
+from app.repositories.booking_repository import BookingConflictError
+from app.repositories.series_repository import BookingSeriesRepository, SeriesConflictError, horizon_end
+from app.repositories.service_repository import ServiceRepository
+from app.schemas.schemas import BookingSeriesCreate, BookingSeriesResponse, SeriesMaterializeResponse, UserPrincipal
+from app.models.models import UserRole
+from app.services.recurrence import series_step
+from app.api.v1.bookings import booking_conflict_error
+
+router = APIRouter(route_class=UnitOfWorkRoute)
+
+MAX_SERIES_SPAN = timedelta(days=731)
+
+
+async def get_owned_series(series_id: int, current_user: UserPrincipal, db: AsyncSession):
+    """Load a series the current user owns (or any series for admins)"""
+    series_repo = BookingSeriesRepository(db)
+    series = await series_repo.get_by_id(series_id)
+    
+    if not series:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Booking series not found"
+        )
+    
+    if current_user.role != UserRole.ADMIN and series.user_id != current_user.id:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this booking series"
+        )
+    
+    return series
+
+
+@router.post("", response_model=BookingSeriesResponse, status_code=status.HTTP_201_CREATED)
+async def create_series(
+    series_data: BookingSeriesCreate,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Create a recurring booking series
+    
+    All occurrences must be free; bookings are created for the upcoming
+    SERIES_HORIZON_DAYS and extended as the horizon rolls forward.
+    """
+    service_repo = ServiceRepository(db)
+    series_repo = BookingSeriesRepository(db)
+    
+    service = await service_repo.get_by_id(series_data.service_id)
+    if not service:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Service not found"
+        )
+    
+    if not service.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Service is not active"
+        )
+    
+    step = series_step(series_data.frequency.value, series_data.interval)
+    if step < timedelta(minutes=service.duration_minutes):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Occurrences would overlap each other"
+        )
+    
+    last_start = series_data.until or series_data.start_time + (series_data.count - 1) * step
+    if last_start - series_data.start_time > MAX_SERIES_SPAN:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="A booking series may span at most two years"
+        )
+    
+    try:
+        series = await series_repo.create(
+            current_user.id,
+            service_id=service.id,
+            start_time=series_data.start_time,
+            duration_minutes=service.duration_minutes,
+            frequency=series_data.frequency,
+            interval=series_data.interval,
+            count=series_data.count,
+            until=series_data.until
+        )
+    except SeriesConflictError as exc:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Booking conflict: occurrences starting at "
+            + ", ".join(start.isoformat() for start in exc.starts[:10])
+            + " are not available"
+        )
+    except BookingConflictError:
+        raise booking_conflict_error()
+    
+    return series
+
+
+@router.post("/materialize", response_model=SeriesMaterializeResponse)
+async def materialize_series(
+    db: AsyncSession = Depends(get_async_db),
+    admin = Depends(require_admin)
+):
+    """Create bookings for every active series up to the rolling horizon (admin only)
+    
+    Nothing else extends series: an external scheduler (cron) must call this
+    at least every SERIES_HORIZON_DAYS, ideally daily.
+    """
+    series_repo = BookingSeriesRepository(db)
+    horizon = horizon_end()
+    due = [series.id for series in await series_repo.get_due(horizon)]
+    
+    created = 0
+    for series_id in due:
+        # A conflict rolls back and expires everything loaded; get reloads the series
+        series = await series_repo.get_by_id(series_id)
+        try:
+            created += await series_repo.materialize(series, horizon)
+            # Each series commits on its own so a conflict only skips that one
+            await commit(db)
+        except BookingConflictError:
+            # A concurrent booking took one of the slots; the next run retries
+            continue
+    
+    return {"series": len(due), "bookings_created": created}
+
+
+@router.get("/{series_id}", response_model=BookingSeriesResponse)
+async def get_series(
+    series_id: int,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Get booking series (owner or admin)"""
+    return await get_owned_series(series_id, current_user, db)
+
+
+@router.delete("/{series_id}", status_code=status.HTTP_204_NO_CONTENT)
+async def cancel_series(
+    series_id: int,
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """Cancel a booking series and its upcoming bookings (owner or admin)"""
+    series_repo = BookingSeriesRepository(db)
+    series = await get_owned_series(series_id, current_user, db)
+    await series_repo.cancel(series)
+    return None
@@ -1,35 +1,123 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from fastapi import APIRouter, Depends, File, HTTPException, Request, UploadFile, status, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import iterate_in_threadpool
+from typing import Optional
+from datetime import datetime, timedelta, timezone
+import csv
+import io
+import os
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.dependencies import require_admin
-from app.repositories.service_repository import ServiceRepository
+from app.core.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, build_page, decode_cursor
+from app.core.replicas import get_read_db, lookup_cached
+from app.core.response_cache import dump_rows
+from app.core.unit_of_work import UnitOfWorkRoute
+from app.repositories.service_repository import ServiceRepository, search_terms
 from app.repositories.review_repository import ReviewRepository
-from app.schemas.schemas import ServiceCreate, ServiceUpdate, ServiceResponse, ReviewResponse
+from app.repositories.booking_repository import BookingRepository
+from app.schemas.schemas import (
+    ServiceCreate, ServiceUpdate, ServiceResponse, ReviewResponse, Page, AvailabilityResponse, ServiceSort,
+    ImportFormat, ServiceImportResponse, MAX_IMPORT_ERRORS
+)
+from app.services.availability import free_slots
+from app.services.service_import import (
+    ImportFileError, csv_records, json_records, ndjson_records, validate_batches
+)
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
+MAX_AVAILABILITY_WINDOW = timedelta(days=31)
 
-@router.get("", response_model=List[ServiceResponse])
+IMPORT_READERS = {
+    ImportFormat.CSV: csv_records,
+    ImportFormat.NDJSON: ndjson_records,
+    ImportFormat.JSON: json_records,
+}
+
+IMPORT_EXTENSIONS = {
+    ".csv": ImportFormat.CSV,
+    ".ndjson": ImportFormat.NDJSON,
+    ".jsonl": ImportFormat.NDJSON,
+    ".json": ImportFormat.JSON,
+}
+
+
+def naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """Query datetimes with an offset as the naive UTC the database stores"""
+    if value is None or value.tzinfo is None:
+        return value
+    return value.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+@router.get("", response_model=Page[ServiceResponse])
 async def get_services(
+    request: Request,
     q: Optional[str] = Query(None, description="Search query"),
     price_min: Optional[float] = Query(None, ge=0, description="Minimum price"),
     price_max: Optional[float] = Query(None, ge=0, description="Maximum price"),
     active: Optional[bool] = Query(None, description="Filter by active status"),
-    db: Session = Depends(get_db)
+    min_rating: Optional[float] = Query(None, ge=0, le=5, description="Minimum average rating"),
+    sort: ServiceSort = Query(ServiceSort.ID, description="Order when not searching"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    """Get all services (public endpoint)"""
+    """Get all services (public endpoint)
+    
+    With q, services matching every word (as a prefix) come best match first.
+    """
+    cached = await lookup_cached(request, "services")
+    if cached.response:
+        return cached.response
+    
     service_repo = ServiceRepository(db)
-    services = service_repo.get_all(q=q, price_min=price_min, price_max=price_max, active=active)
-    return services
+    terms = search_terms(q) if q else []
+    
+    if terms:
+        after = decode_cursor(cursor, float, int) if cursor else None
+        rows = await service_repo.search(
+            terms,
+            price_min=price_min,
+            price_max=price_max,
+            active=active,
+            min_rating=min_rating,
+            limit=limit,
+            after=after
+        )
+        page = build_page(rows, limit, lambda row: (row[1], row[0].id))
+        page["items"] = [service for service, _ in page["items"]]
+        return await cached.store(Page[ServiceResponse], page)
+    
+    if sort == ServiceSort.RATING:
+        after = decode_cursor(cursor, float, int) if cursor else None
+        cursor_key = lambda service: (service["rating_average"], service["id"])
+    else:
+        after = decode_cursor(cursor, int) if cursor else None
+        cursor_key = lambda service: (service["id"],)
+    
+    # Listings skip the ORM: rows come as ServiceResponse-shaped dicts, dumped unvalidated
+    services = await service_repo.get_all_rows(
+        price_min=price_min,
+        price_max=price_max,
+        active=active,
+        min_rating=min_rating,
+        sort=sort,
+        limit=limit,
+        after=after
+    )
+    return await cached.store_json(dump_rows(build_page(services, limit, cursor_key)))
 
 
 @router.get("/{service_id}", response_model=ServiceResponse)
-async def get_service(service_id: int, db: Session = Depends(get_db)):
+async def get_service(service_id: int, request: Request, db: AsyncSession = Depends(get_read_db)):
     """Get service by ID (public endpoint)"""
+    cached = await lookup_cached(request, "services")
+    if cached.response:
+        return cached.response
+    
     service_repo = ServiceRepository(db)
-    service = service_repo.get_by_id(service_id)
+    service = await service_repo.get_by_id(service_id)
     
     if not service:
         raise HTTPException(
@@ -37,31 +125,73 @@ async def get_service(service_id: int, db: Session = Depends(get_db)):
             detail="Service not found"
         )
     
-    return service
+    return await cached.store(ServiceResponse, service)
 
 
 @router.post("", response_model=ServiceResponse, status_code=status.HTTP_201_CREATED)
 async def create_service(
     service_data: ServiceCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin = Depends(require_admin)
 ):
     """Create new service (admin only)"""
     service_repo = ServiceRepository(db)
-    service = service_repo.create(service_data)
+    service = await service_repo.create(service_data)
     return service
 
 
+@router.post("/import", response_model=ServiceImportResponse)
+async def import_services(
+    file: UploadFile = File(..., description="CSV with a header row, NDJSON or a JSON array of services"),
+    format: Optional[ImportFormat] = Query(None, description="csv, ndjson or json (default: from the file name)"),
+    db: AsyncSession = Depends(get_async_db),
+    admin = Depends(require_admin)
+):
+    """Create services from an uploaded file (admin only)
+    
+    The file is read and validated in batches, off the event loop. Valid rows
+    are inserted in one transaction; invalid rows are skipped and reported.
+    """
+    import_format = format or IMPORT_EXTENSIONS.get(os.path.splitext(file.filename or "")[1].lower())
+    if import_format is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cannot tell the file format; pass format=csv, ndjson or json"
+        )
+    
+    text = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    report = {"imported": 0, "rejected": 0, "errors": []}
+    
+    def valid_batches():
+        for rows, errors in validate_batches(IMPORT_READERS[import_format](text)):
+            report["rejected"] += len({error["row"] for error in errors})
+            report["errors"].extend(errors[:MAX_IMPORT_ERRORS - len(report["errors"])])
+            yield rows
+    
+    service_repo = ServiceRepository(db)
+    try:
+        report["imported"] = await service_repo.create_many(iterate_in_threadpool(valid_batches()))
+    except (ImportFileError, UnicodeDecodeError, csv.Error) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot read import file: {exc}"
+        )
+    finally:
+        text.detach()
+    
+    return report
+
+
 @router.patch("/{service_id}", response_model=ServiceResponse)
 async def update_service(
     service_id: int,
     service_data: ServiceUpdate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin = Depends(require_admin)
 ):
     """Update service (admin only)"""
     service_repo = ServiceRepository(db)
-    service = service_repo.get_by_id(service_id)
+    service = await service_repo.get_by_id(service_id)
     
     if not service:
         raise HTTPException(
@@ -69,19 +199,19 @@ async def update_service(
             detail="Service not found"
         )
     
-    updated_service = service_repo.update(service, service_data)
+    updated_service = await service_repo.update(service, service_data)
     return updated_service
 
 
 @router.delete("/{service_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_service(
     service_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     admin = Depends(require_admin)
 ):
     """Delete service (admin only)"""
     service_repo = ServiceRepository(db)
-    service = service_repo.get_by_id(service_id)
+    service = await service_repo.get_by_id(service_id)
     
     if not service:
         raise HTTPException(
@@ -89,23 +219,90 @@ async def delete_service(
             detail="Service not found"
         )
     
-    service_repo.delete(service)
+    await service_repo.delete(service)
     return None
 
 
-@router.get("/{service_id}/reviews", response_model=List[ReviewResponse])
-async def get_service_reviews(service_id: int, db: Session = Depends(get_db)):
-    """Get all reviews for a service (public endpoint)"""
+@router.get("/{service_id}/reviews", response_model=Page[ReviewResponse])
+async def get_service_reviews(
+    service_id: int,
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Page size"),
+    cursor: Optional[str] = Query(None, description="Cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get reviews for a service (public endpoint)"""
+    cached = await lookup_cached(request, "reviews")
+    if cached.response:
+        return cached.response
+    
     service_repo = ServiceRepository(db)
     review_repo = ReviewRepository(db)
     
     # Check if service exists
-    service = service_repo.get_by_id(service_id)
+    service = await service_repo.get_by_id(service_id)
+    if not service:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Service not found"
+        )
+    
+    after = decode_cursor(cursor, int) if cursor else None
+    reviews = await review_repo.get_by_service_id(
+        service_id,
+        limit=limit,
+        after_id=after[0] if after else None
+    )
+    return await cached.store(Page[ReviewResponse], build_page(reviews, limit, lambda review: (review.id,)))
+
+
+@router.get("/{service_id}/availability", response_model=AvailabilityResponse)
+async def get_service_availability(
+    service_id: int,
+    from_date: Optional[datetime] = Query(None, alias="from", description="Window start (default: now)"),
+    to_date: Optional[datetime] = Query(None, alias="to", description="Window end (default: 7 days after start)"),
+    granularity: Optional[int] = Query(None, gt=0, le=1440, description="Minutes between slot starts (default: service duration)"),
+    db: AsyncSession = Depends(get_read_db)
+):
+    """Get free booking slots for a service (public endpoint)"""
+    service_repo = ServiceRepository(db)
+    booking_repo = BookingRepository(db)
+    
+    service = await service_repo.get_by_id(service_id)
     if not service:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Service not found"
         )
     
-    reviews = review_repo.get_by_service_id(service_id)
-    return reviews
\ No newline at end of file
+    if not service.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Service is not active"
+        )
+    
+    # Slots in the past cannot be booked
+    window_start = max(naive_utc(from_date) or datetime.utcnow(), datetime.utcnow())
+    window_end = naive_utc(to_date) or window_start + timedelta(days=7)
+    if window_end <= window_start or window_end - window_start > MAX_AVAILABILITY_WINDOW:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Availability window must be in the future and at most 31 days long"
+        )
+    
+    granularity_minutes = granularity or service.duration_minutes
+    busy = await booking_repo.get_busy_intervals(service_id, window_start, window_end)
+    slots = free_slots(
+        busy,
+        window_start,
+        window_end,
+        duration=timedelta(minutes=service.duration_minutes),
+        granularity=timedelta(minutes=granularity_minutes)
+    )
+    
+    return {
+        "service_id": service_id,
+        "duration_minutes": service.duration_minutes,
+        "granularity_minutes": granularity_minutes,
+        "slots": [{"start_time": start, "end_time": end} for start, end in slots]
+    }
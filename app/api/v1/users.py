@@ -1,17 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.database import get_async_db
 from app.core.dependencies import get_current_user
+from app.core.unit_of_work import UnitOfWorkRoute
 from app.repositories.user_repository import UserRepository
-from app.schemas.schemas import UserResponse, UserUpdate
-from app.models.models import User
+from app.schemas.schemas import UserResponse, UserUpdate, UserPrincipal
 
-router = APIRouter()
+router = APIRouter(route_class=UnitOfWorkRoute)
 
 
 @router.get("/me", response_model=UserResponse)
-async def get_current_user_profile(current_user: User = Depends(get_current_user)):
+async def get_current_user_profile(current_user: UserPrincipal = Depends(get_current_user)):
     """Get current user profile"""
     return current_user
 
@@ -19,20 +19,22 @@ async def get_current_user_profile(current_user: User = Depends(get_current_user
 @router.patch("/me", response_model=UserResponse)
 async def update_current_user(
     user_data: UserUpdate,
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    current_user: UserPrincipal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """Update current user profile"""
     user_repo = UserRepository(db)
     
     # Check if email is already taken by another user
     if user_data.email:
-        existing_user = user_repo.get_by_email(user_data.email)
+        existing_user = await user_repo.get_by_email(user_data.email)
         if existing_user and existing_user.id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already in use"
             )
     
-    updated_user = user_repo.update(current_user, user_data)
+    # The cached principal is a snapshot; load the row to update it
+    user = await user_repo.get_by_id(current_user.id)
+    updated_user = await user_repo.update(user, user_data)
     return updated_user
\ No newline at end of file
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import List
+from typing import List, Optional
 import os
 from pathlib import Path
 
@@ -15,15 +15,56 @@ class Settings(BaseSettings):
     APP_NAME: str = "BookIt API"
     DEBUG: bool = False
     ALLOWED_ORIGINS: List[str] = ["*"]
+    ENVIRONMENT: str = "development"
     
     # Database
     DATABASE_URL: str
+    # Derived from DATABASE_URL (asyncpg / aiosqlite) when not set
+    ASYNC_DATABASE_URL: Optional[str] = None
+    # Schema handling at startup: "create" (create_all), "verify" (require the
+    # Alembic head, no DDL) or "skip"; defaults to "verify" in production
+    SCHEMA_STARTUP_MODE: Optional[str] = None
+    
+    # Connection pool, per worker: each holds up to DB_POOL_SIZE + DB_MAX_OVERFLOW connections
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = -1
+    DB_POOL_PRE_PING: bool = True
+    DB_POOL_USE_LIFO: bool = False
+    # Behind PgBouncer in transaction mode: no client-side pool, no reused prepared statements
+    DB_EXTERNAL_POOLER: bool = False
+    
+    # Read replicas for read-only endpoints, as a JSON list of database URLs
+    REPLICA_DATABASE_URLS: List[str] = []
+    # Users read from the primary for this long after a write of theirs
+    REPLICA_STICKY_SECONDS: int = 5
+    # A replica that failed to connect is skipped for this long
+    REPLICA_RETRY_SECONDS: int = 30
     
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
+    TOKEN_CACHE_MAX_SIZE: int = 10000
+    
+    # Password hashing
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 64
+    
+    # Authenticated user cache (per worker)
+    USER_CACHE_TTL_SECONDS: int = 60
+    USER_CACHE_MAX_SIZE: int = 10000
+    
+    # Recurring booking series: occurrences are created this far ahead
+    SERIES_HORIZON_DAYS: int = 28
+    
+    # Public catalog response cache: "memory" (per worker), "redis" (shared) or "none"
+    RESPONSE_CACHE_BACKEND: str = "memory"
+    RESPONSE_CACHE_REDIS_URL: Optional[str] = None
+    RESPONSE_CACHE_TTL_SECONDS: int = 30
+    RESPONSE_CACHE_MAX_SIZE: int = 1000
     
     model_config = SettingsConfigDict(
         env_file=str(ENV_FILE),
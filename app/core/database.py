@@ -1,25 +1,153 @@
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, NullPool, QueuePool
+from typing import Any, Dict
+from uuid import uuid4
+import time
 
 from app.core.config import settings
 
-engine = create_engine(
-    settings.DATABASE_URL,
-    pool_pre_ping=True,
-    pool_size=5,
-    max_overflow=10
-)
+# Async drivers used for each sync dialect in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Translate a sync database URL into its async driver equivalent"""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend in ASYNC_DRIVERS and url.get_driver_name() != ASYNC_DRIVERS[backend]:
+        url = url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+    return url.render_as_string(hide_password=False)
+
+
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+
+
+class PoolMetrics:
+    """Connection checkouts from this worker's async pool"""
+    
+    def __init__(self):
+        self.reset()
+    
+    def reset(self) -> None:
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+    
+    def record(self, seconds: float) -> None:
+        self.checkouts += 1
+        self.wait_seconds_total += seconds
+        self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+    
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "wait_seconds_total": round(self.wait_seconds_total, 6),
+            "wait_seconds_max": round(self.wait_seconds_max, 6),
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class MeteredPoolMixin:
+    """Times each checkout: waiting for a free connection, or opening a new one"""
+    
+    def connect(self):
+        started = time.perf_counter()
+        try:
+            return super().connect()
+        except PoolTimeoutError:
+            pool_metrics.timeouts += 1
+            raise
+        finally:
+            pool_metrics.record(time.perf_counter() - started)
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+class MeteredQueuePool(MeteredPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+class MeteredNullPool(MeteredPoolMixin, NullPool):
+    pass
+
+
+def engine_options(database_url: str, is_async: bool = False, metered: bool = True) -> Dict[str, Any]:
+    """Pool and driver arguments for an engine on database_url, from settings
+    
+    Async engines report to pool_metrics unless metered is False.
+    """
+    url = make_url(database_url)
+    options: Dict[str, Any] = {"pool_pre_ping": settings.DB_POOL_PRE_PING}
+    
+    if settings.DB_EXTERNAL_POOLER:
+        # PgBouncer (transaction mode) pools server connections and may run each
+        # transaction on a different one, so prepared statements must not be
+        # cached or share names across connections
+        options["poolclass"] = MeteredNullPool if is_async and metered else NullPool
+        if url.get_driver_name() == "asyncpg":
+            options["connect_args"] = {
+                "statement_cache_size": 0,
+                "prepared_statement_cache_size": 0,
+                "prepared_statement_name_func": lambda: f"__asyncpg_{uuid4()}__",
+            }
+        return options
+    
+    # aiosqlite file databases run on NullPool, which takes no sizing arguments
+    if is_async and url.get_backend_name() == "sqlite":
+        return options
+    
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_use_lifo=settings.DB_POOL_USE_LIFO
+    )
+    if is_async:
+        options["poolclass"] = MeteredQueuePool if metered else AsyncAdaptedQueuePool
+    return options
+
+
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **engine_options(ASYNC_DATABASE_URL, is_async=True))
+
+# Objects stay usable after commit: lazy reloads are not possible on an AsyncSession
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    class_=AsyncSession,
+    autoflush=False,
+    expire_on_commit=False
+)
 
 Base = declarative_base()
 
 
-def get_db():
-    """Database session dependency"""
-    db = SessionLocal()
-    try:
+async def get_async_db(request: Request):
+    """Async database session dependency, committed once by UnitOfWorkRoute"""
+    async with AsyncSessionLocal() as db:
+        request.state.db = db
         yield db
-    finally:
-        db.close()
\ No newline at end of file
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Occupancy of this worker's async pool and its checkout wait times"""
+    pool = async_engine.pool
+    stats = {"pool": type(pool).__name__, **pool_metrics.snapshot()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            # Negative while the pool has not opened all of its base connections
+            overflow=max(pool.overflow(), 0),
+            max_overflow=settings.DB_MAX_OVERFLOW
+        )
+    return stats
@@ -1,20 +1,22 @@
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.database import get_db
+from app.core.cache import user_cache
+from app.core.database import get_async_db
 from app.core.security import decode_token
-from app.models.models import User, UserRole
+from app.models.models import UserRole
 from app.repositories.user_repository import UserRepository
+from app.schemas.schemas import UserPrincipal
 
 security = HTTPBearer()
 
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> User:
-    """Get current authenticated user from JWT token"""
+    db: AsyncSession = Depends(get_async_db)
+) -> UserPrincipal:
+    """Get current authenticated user from JWT token (cached per user ID)"""
     token = credentials.credentials
     payload = decode_token(token)
     
@@ -25,7 +27,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    user_id: int = payload.get("sub")
+    user_id = payload.get("sub")
     if user_id is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -33,8 +35,13 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    user_id = int(user_id)
+    principal = user_cache.get(user_id)
+    if principal is not None:
+        return principal
+    
     user_repo = UserRepository(db)
-    user = user_repo.get_by_id(user_id)
+    user = await user_repo.get_by_id(user_id)
     
     if user is None:
         raise HTTPException(
@@ -43,19 +50,21 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    return user
+    principal = UserPrincipal.model_validate(user)
+    user_cache.set(user_id, principal)
+    return principal
 
 
 async def get_current_active_user(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_user)
+) -> UserPrincipal:
     """Ensure user is active (can be extended with is_active field)"""
     return current_user
 
 
 async def require_admin(
-    current_user: User = Depends(get_current_user)
-) -> User:
+    current_user: UserPrincipal = Depends(get_current_user)
+) -> UserPrincipal:
     """Require admin role"""
     if current_user.role != UserRole.ADMIN:
         raise HTTPException(
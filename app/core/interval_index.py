@@ -0,0 +1,37 @@
+from bisect import bisect_left, insort
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+class ServiceIntervals:
+    """Sorted (start, end, booking_id) intervals of one service"""
+    
+    def __init__(self, rows: Iterable[Tuple[datetime, datetime, int]]):
+        self.entries: List[Tuple[datetime, datetime, int]] = sorted(tuple(row) for row in rows)
+        self.spans: Dict[int, Tuple[datetime, datetime]] = {
+            booking_id: (start_time, end_time) for start_time, end_time, booking_id in self.entries
+        }
+        # Upper bound on interval length: no interval starting earlier than this before a point reaches it
+        self.longest = max((end_time - start_time for start_time, end_time, _ in self.entries), default=timedelta(0))
+    
+    def overlaps(self, start_time: datetime, end_time: datetime, exclude_booking_id: Optional[int] = None) -> bool:
+        # Stored bookings may overlap each other where no constraint prevents it, so walk
+        # back from the last interval starting before end_time while one could reach start_time
+        position = bisect_left(self.entries, (end_time,)) - 1
+        while position >= 0 and self.entries[position][0] + self.longest > start_time:
+            _, entry_end, booking_id = self.entries[position]
+            if entry_end > start_time and booking_id != exclude_booking_id:
+                return True
+            position -= 1
+        return False
+    
+    def add(self, booking_id: int, start_time: datetime, end_time: datetime) -> None:
+        self.remove(booking_id)
+        self.longest = max(self.longest, end_time - start_time)
+        self.spans[booking_id] = (start_time, end_time)
+        insort(self.entries, (start_time, end_time, booking_id))
+    
+    def remove(self, booking_id: int) -> None:
+        span = self.spans.pop(booking_id, None)
+        if span is not None:
+            self.entries.pop(bisect_left(self.entries, (*span, booking_id)))
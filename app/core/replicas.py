@@ -0,0 +1,163 @@
+from fastapi import Depends, Request
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+from typing import Any, Callable, List, Optional, Union
+import logging
+import time
+
+from app.core.config import settings
+from app.core.database import engine_options, get_async_database_url, get_async_db
+from app.core.response_cache import CachedRequest, response_cache
+from app.core.security import decode_token
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaSet:
+    """Replica engines taken in turn, skipping any that recently failed to connect"""
+    
+    def __init__(self, engines: List[AsyncEngine], retry_seconds: float, clock: Callable[[], float] = time.monotonic):
+        self.engines = engines
+        self.retry_seconds = retry_seconds
+        self.clock = clock
+        self._next = 0
+        self._down_until = [0.0] * len(engines)
+    
+    def candidates(self) -> List[AsyncEngine]:
+        """Healthy replicas, starting with the next one in round-robin order"""
+        if not self.engines:
+            return []
+        start = self._next
+        self._next = (start + 1) % len(self.engines)
+        now = self.clock()
+        order = [(start + offset) % len(self.engines) for offset in range(len(self.engines))]
+        return [self.engines[index] for index in order if self._down_until[index] <= now]
+    
+    def mark_down(self, engine: AsyncEngine) -> None:
+        self._down_until[self.engines.index(engine)] = self.clock() + self.retry_seconds
+    
+    def connect(self) -> Optional[Connection]:
+        """A connection to the first healthy replica that answers, or None
+        
+        Synchronous: ReplicaSession calls it from inside the session's greenlet.
+        """
+        for engine in self.candidates():
+            try:
+                return engine.sync_engine.connect()
+            except (DBAPIError, OSError):
+                logger.warning("Replica %s is unavailable, skipping it for %ss", engine.url, self.retry_seconds)
+                self.mark_down(engine)
+        return None
+
+
+class ReplicaSession(Session):
+    """Session of get_read_db, bound to a replica on its first query
+    
+    Requests that never query (response cache hits, 304s) take no connection.
+    Falls back to the primary engine when no replica answers.
+    """
+    
+    def __init__(self, replicas: ReplicaSet, primary: Engine, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.replicas = replicas
+        self.primary = primary
+        self.replica_connection: Optional[Connection] = None
+        self.resolved_bind: Optional[Union[Connection, Engine]] = None
+    
+    def get_bind(self, *args: Any, **kwargs: Any) -> Union[Connection, Engine]:
+        if self.resolved_bind is None:
+            self.replica_connection = self.replicas.connect()
+            self.resolved_bind = self.replica_connection or self.primary
+        return self.resolved_bind
+    
+    def close(self) -> None:
+        super().close()
+        if self.replica_connection is not None:
+            self.replica_connection.close()
+        self.replica_connection = None
+        self.resolved_bind = None
+
+
+def build_replica_set() -> ReplicaSet:
+    """Engines for REPLICA_DATABASE_URLS
+    
+    The sticky-primary window must be seen by every worker and must not be
+    evicted by cached pages, so replicas require the Redis response cache.
+    """
+    if settings.REPLICA_DATABASE_URLS and settings.RESPONSE_CACHE_BACKEND.lower() != "redis":
+        raise RuntimeError("REPLICA_DATABASE_URLS requires RESPONSE_CACHE_BACKEND=redis")
+    engines = []
+    for url in settings.REPLICA_DATABASE_URLS:
+        async_url = get_async_database_url(url)
+        engines.append(create_async_engine(async_url, **engine_options(async_url, is_async=True, metered=False)))
+    return ReplicaSet(engines, retry_seconds=settings.REPLICA_RETRY_SECONDS)
+
+
+replica_set = build_replica_set()
+
+
+def request_user_id(request: Request) -> Optional[int]:
+    """The user a request's bearer token belongs to, without touching the database"""
+    scheme, _, token = request.headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    payload = decode_token(token)
+    if payload is None or payload.get("type") != "access" or payload.get("sub") is None:
+        return None
+    return int(payload["sub"])
+
+
+async def stick_to_primary(request: Request) -> None:
+    """Send the requesting user's reads to the primary for a short while after a write
+    
+    Replicas may lag behind; this way users always see their own changes. The
+    window is kept in the Redis response cache backend, shared by all workers.
+    """
+    user_id = request_user_id(request)
+    if replica_set.engines and user_id is not None and settings.REPLICA_STICKY_SECONDS > 0:
+        await response_cache.backend.set(f"primary:{user_id}", b"1", settings.REPLICA_STICKY_SECONDS)
+
+
+async def is_sticky(request: Request) -> bool:
+    """Whether the requesting user reads from the primary, checked once per request"""
+    sticky = getattr(request.state, "sticky", None)
+    if sticky is None:
+        user_id = request_user_id(request)
+        sticky = bool(replica_set.engines) and user_id is not None and (
+            await response_cache.backend.get(f"primary:{user_id}") is not None
+        )
+        request.state.sticky = sticky
+    return sticky
+
+
+async def lookup_cached(request: Request, *namespaces: str) -> CachedRequest:
+    """response_cache.lookup for endpoints reading through get_read_db
+    
+    Users pinned to the primary bypass the cache both ways: entries may have
+    been built from a replica that had not yet caught up with their write.
+    """
+    if await is_sticky(request):
+        return CachedRequest(response_cache, request, None, None)
+    return await response_cache.lookup(request, *namespaces)
+
+
+async def get_read_db(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """Session for read-only endpoints: a replica unless the caller wrote recently
+    
+    The request's primary session is used when no replica is configured; the
+    replica itself is picked, and connected to, only once the endpoint queries.
+    """
+    if not replica_set.engines or await is_sticky(request):
+        yield db
+        return
+    
+    async with AsyncSession(
+        sync_session_class=ReplicaSession,
+        replicas=replica_set,
+        primary=db.get_bind(),
+        autoflush=False,
+        expire_on_commit=False
+    ) as replica_db:
+        yield replica_db
@@ -0,0 +1,179 @@
+from fastapi import Request, Response, status
+from functools import lru_cache
+from pydantic import TypeAdapter
+from typing import Any, Dict, Optional
+from urllib.parse import urlencode
+import hashlib
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class MemoryBackend:
+    """Per-worker backend on the in-process LRU cache"""
+    
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.entries = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self.generations: Dict[str, int] = {}
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        return self.entries.get(key)
+    
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        self.entries.set(key, value, ttl_seconds)
+    
+    async def generation(self, namespace: str) -> int:
+        return self.generations.get(namespace, 0)
+    
+    async def bump(self, namespace: str) -> None:
+        self.generations[namespace] = self.generations.get(namespace, 0) + 1
+    
+    async def clear(self) -> None:
+        self.entries.clear()
+        self.generations.clear()
+
+
+class RedisBackend:
+    """Backend shared by all workers, on any client with redis.asyncio's get/set/incr"""
+    
+    def __init__(self, client: Any, prefix: str = "bookit:"):
+        self.client = client
+        self.prefix = prefix
+    
+    @classmethod
+    def from_url(cls, url: str) -> "RedisBackend":
+        try:
+            import redis.asyncio as redis
+        except ImportError as exc:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the redis package") from exc
+        return cls(redis.from_url(url))
+    
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self.client.get(self.prefix + key)
+    
+    async def set(self, key: str, value: bytes, ttl_seconds: float) -> None:
+        await self.client.set(self.prefix + key, value, ex=max(int(ttl_seconds), 1))
+    
+    async def generation(self, namespace: str) -> int:
+        return int(await self.client.get(f"{self.prefix}generation:{namespace}") or 0)
+    
+    async def bump(self, namespace: str) -> None:
+        await self.client.incr(f"{self.prefix}generation:{namespace}")
+    
+    async def clear(self) -> None:
+        """Entries of older generations simply expire"""
+
+
+@lru_cache(maxsize=None)
+def _adapter(model: Any) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+_rows_adapter = TypeAdapter(Any)
+
+
+def dump_rows(content: Any) -> bytes:
+    """JSON for content already shaped like its response schema, without validating it
+    
+    For plain dicts and lists of repository projections: datetimes, enums and
+    dict keys come out as the schema's serializer would write them.
+    """
+    return _rows_adapter.dump_json(content)
+
+
+def _etag(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def _matches(request: Request, etag: str) -> bool:
+    """Whether the client already holds this representation (If-None-Match)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    tags = [tag.strip().removeprefix("W/") for tag in header.split(",")]
+    return "*" in tags or etag in tags
+
+
+def _render(request: Request, etag: str, body: bytes) -> Response:
+    if _matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+class CachedRequest:
+    """A request looked up in the response cache; `response` is set on a hit"""
+    
+    def __init__(self, cache: "ResponseCache", request: Request, key: Optional[str], response: Optional[Response]):
+        self.cache = cache
+        self.request = request
+        self.key = key
+        self.response = response
+    
+    async def store(self, model: Any, content: Any) -> Response:
+        """Serialize content as model once, cache it and answer with an ETag"""
+        adapter = _adapter(model)
+        return await self.store_json(adapter.dump_json(adapter.validate_python(content, from_attributes=True)))
+    
+    async def store_json(self, body: bytes) -> Response:
+        """Cache an already serialized body and answer with an ETag"""
+        etag = _etag(body)
+        if self.key is not None:
+            await self.cache.backend.set(self.key, etag.encode() + b"\n" + body, self.cache.ttl_seconds)
+        return _render(self.request, etag, body)
+
+
+class ResponseCache:
+    """Serialized responses keyed on path and normalized query parameters
+    
+    Keys embed a generation counter per namespace; invalidating a namespace
+    bumps its counter, so every older entry stops matching at once. A request
+    reads the generations before querying the database, so a response built
+    while a write commits is stored under the old generation and never served.
+    """
+    
+    def __init__(self, backend: Any, ttl_seconds: float, enabled: bool = True):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.enabled = enabled
+    
+    async def lookup(self, request: Request, *namespaces: str) -> CachedRequest:
+        if not self.enabled:
+            return CachedRequest(self, request, None, None)
+        
+        generations = ",".join([f"{namespace}.{await self.backend.generation(namespace)}" for namespace in namespaces])
+        query = urlencode(sorted(request.query_params.multi_items()))
+        key = f"{generations}|{request.url.path}?{query}"
+        
+        entry = await self.backend.get(key)
+        if entry is None:
+            return CachedRequest(self, request, key, None)
+        etag, body = entry.split(b"\n", 1)
+        return CachedRequest(self, request, key, _render(request, etag.decode(), body))
+    
+    async def invalidate(self, *namespaces: str) -> None:
+        if self.enabled:
+            for namespace in namespaces:
+                await self.backend.bump(namespace)
+    
+    async def clear(self) -> None:
+        await self.backend.clear()
+
+
+def build_response_cache() -> ResponseCache:
+    backend_name = settings.RESPONSE_CACHE_BACKEND.lower()
+    if backend_name == "redis":
+        backend = RedisBackend.from_url(settings.RESPONSE_CACHE_REDIS_URL)
+    else:
+        backend = MemoryBackend(
+            max_size=settings.RESPONSE_CACHE_MAX_SIZE,
+            ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS
+        )
+    return ResponseCache(
+        backend,
+        ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+        enabled=backend_name != "none"
+    )
+
+
+# Public catalog responses (services, service details and reviews)
+response_cache = build_response_cache()
@@ -1,16 +1,32 @@
-from passlib.context import CryptContext
-from jose import JWTError, jwt
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
+import asyncio
+import hashlib
+import threading
+import time
 
+from app.core.cache import TTLCache
 from app.core.config import settings
 
-# Configure passlib to truncate passwords automatically
-pwd_context = CryptContext(
-    schemes=["bcrypt"],
-    deprecated="auto",
-    bcrypt__truncate_error=False  # Allow truncation instead of error
-)
+if TYPE_CHECKING:
+    from passlib.context import CryptContext
+
+# passlib and python-jose (which loads cryptography) are imported on first use,
+# keeping them out of every worker's cold start
+
+
+@lru_cache(maxsize=None)
+def get_pwd_context() -> "CryptContext":
+    """Configure passlib to truncate passwords automatically"""
+    from passlib.context import CryptContext
+    
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__truncate_error=False  # Allow truncation instead of error
+    )
 
 
 def hash_password(password: str) -> str:
@@ -18,7 +34,7 @@ def hash_password(password: str) -> str:
     # Truncate to 72 bytes if needed (bcrypt limitation)
     if len(password.encode('utf-8')) > 72:
         password = password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -26,11 +42,66 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     # Truncate to 72 bytes if needed (bcrypt limitation)
     if len(plain_password.encode('utf-8')) > 72:
         plain_password = plain_password.encode('utf-8')[:72].decode('utf-8', errors='ignore')
-    return pwd_context.verify(plain_password, hashed_password)
+    return get_pwd_context().verify(plain_password, hashed_password)
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when too many password hashes are already queued"""
+
+
+class PasswordHasher:
+    """Runs bcrypt on a bounded thread pool so it never blocks the event loop"""
+    
+    def __init__(self, max_workers: int, max_pending: int):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+    
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="bcrypt")
+        return self._executor
+    
+    async def _run(self, func, *args):
+        # Reject instead of queueing unboundedly so a login storm sheds load early
+        with self._lock:
+            if self.pending >= self.max_pending:
+                raise PasswordHasherBusy()
+            self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+    
+    async def hash(self, password: str) -> str:
+        """Hash a password without blocking the event loop"""
+        return await self._run(hash_password, password)
+    
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password without blocking the event loop"""
+        return await self._run(verify_password, plain_password, hashed_password)
+    
+    def shutdown(self) -> None:
+        """Stop the worker threads"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING
+)
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create JWT access token"""
+    from jose import jwt
+    
     to_encode = data.copy()
     if expires_delta:
         expire = datetime.utcnow() + expires_delta
@@ -44,6 +115,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
 
 def create_refresh_token(data: dict) -> str:
     """Create JWT refresh token"""
+    from jose import jwt
+    
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     to_encode.update({"exp": expire, "type": "refresh"})
@@ -51,10 +124,29 @@ def create_refresh_token(data: dict) -> str:
     return encoded_jwt
 
 
+# Verified claims keyed by token digest; entries never outlive the access token lifetime
+token_cache = TTLCache(
+    max_size=settings.TOKEN_CACHE_MAX_SIZE,
+    ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+
+
 def decode_token(token: str) -> dict:
-    """Decode and verify JWT token"""
+    """Decode and verify JWT token, reusing claims verified by earlier calls"""
+    key = hashlib.sha256(token.encode()).digest()
+    claims = token_cache.get(key)
+    # Same expiry rule as jose: expired once exp is in the past (whole seconds)
+    if claims is not None and claims["exp"] >= int(time.time()):
+        return dict(claims)
+    
+    from jose import JWTError, jwt
+    
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
-        return payload
     except JWTError:
-        return None
\ No newline at end of file
+        return None
+    
+    if "exp" in payload:
+        # exp itself is still a valid second, so keep the entry until it has passed
+        token_cache.set(key, dict(payload), ttl_seconds=payload["exp"] - time.time() + 1)
+    return payload
\ No newline at end of file
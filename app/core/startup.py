@@ -0,0 +1,108 @@
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from typing import FrozenSet, Iterator, List, Optional, Tuple
+import ast
+import re
+import time
+
+from app.core.config import BASE_DIR, settings
+from app.core.database import Base
+
+VERSIONS_DIR = BASE_DIR / "alembic" / "versions"
+REVISION_ASSIGNMENT = re.compile(r"^(revision|down_revision)\b[^=\n]*=\s*(.+)$", re.MULTILINE)
+
+SCHEMA_MODES = ("create", "verify", "skip")
+
+
+class SchemaVersionError(RuntimeError):
+    """The database is not at the migration head this code expects"""
+
+
+class StartupTimer:
+    """Durations of the named startup phases, measured from `started`"""
+    
+    def __init__(self, started: Optional[float] = None):
+        self.started = started if started is not None else time.perf_counter()
+        self.last = self.started
+        self.phases: List[Tuple[str, float]] = []
+    
+    def mark(self, name: str) -> None:
+        """Close a phase that ran since the previous mark"""
+        now = time.perf_counter()
+        self.phases.append((name, now - self.last))
+        self.last = now
+    
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        self.last = time.perf_counter()
+        yield
+        self.mark(name)
+    
+    def __str__(self) -> str:
+        phases = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in self.phases)
+        return f"{(self.last - self.started) * 1000:.0f} ms ({phases})"
+
+
+def schema_mode() -> str:
+    """SCHEMA_STARTUP_MODE, defaulting to no DDL in production"""
+    mode = settings.SCHEMA_STARTUP_MODE or ("verify" if settings.ENVIRONMENT == "production" else "create")
+    if mode not in SCHEMA_MODES:
+        raise ValueError(f"SCHEMA_STARTUP_MODE must be one of {', '.join(SCHEMA_MODES)}")
+    return mode
+
+
+@lru_cache(maxsize=None)
+def expected_heads(versions_dir: Path = VERSIONS_DIR) -> FrozenSet[str]:
+    """Head revisions of the migration scripts, read without importing them"""
+    revisions = set()
+    parents = set()
+    for path in versions_dir.glob("*.py"):
+        values = dict(
+            (name, ast.literal_eval(value.strip()))
+            for name, value in REVISION_ASSIGNMENT.findall(path.read_text())
+        )
+        if "revision" not in values:
+            continue
+        revisions.add(values["revision"])
+        down_revision = values.get("down_revision")
+        if isinstance(down_revision, (tuple, list)):
+            parents.update(down_revision)
+        elif down_revision:
+            parents.add(down_revision)
+    return frozenset(revisions - parents)
+
+
+async def current_heads(engine: AsyncEngine) -> FrozenSet[str]:
+    """Revisions stamped in alembic_version; empty when the table does not exist"""
+    try:
+        async with engine.connect() as conn:
+            result = await conn.execute(text("SELECT version_num FROM alembic_version"))
+            return frozenset(result.scalars().all())
+    except DBAPIError:
+        return frozenset()
+
+
+async def verify_schema(engine: AsyncEngine) -> None:
+    """Fail unless the database is at the head of the migration scripts
+    
+    One SELECT, no catalog introspection and no DDL.
+    """
+    expected = expected_heads()
+    current = await current_heads(engine)
+    if current != expected:
+        raise SchemaVersionError(
+            f"Database schema is at {', '.join(sorted(current)) or 'no revision'}, "
+            f"expected {', '.join(sorted(expected))}; run `alembic upgrade head`"
+        )
+
+
+async def prepare_schema(engine: AsyncEngine, mode: str) -> None:
+    if mode == "create":
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+    elif mode == "verify":
+        await verify_schema(engine)
@@ -0,0 +1,97 @@
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Any, Awaitable, Callable, Optional
+import inspect
+
+from app.core.replicas import stick_to_primary
+
+# Session.info key of the callbacks waiting for the request's commit
+AFTER_COMMIT = "after_commit"
+# Session.info flags: writes sent in the open transaction, and writes committed
+PENDING_WRITE = "pending_write"
+WROTE = "wrote"
+
+
+@event.listens_for(Session, "after_flush")
+def _record_flush(session: Session, flush_context: Any) -> None:
+    session.info[PENDING_WRITE] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _record_write_statement(orm_execute_state: Any) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[PENDING_WRITE] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _record_commit(session: Session) -> None:
+    if session.info.pop(PENDING_WRITE, False):
+        session.info[WROTE] = True
+
+
+@event.listens_for(Session, "after_rollback")
+def _record_rollback(session: Session) -> None:
+    session.info.pop(PENDING_WRITE, None)
+
+
+def after_commit(db: AsyncSession, callback: Callable[[], Any]) -> None:
+    """Run callback (sync or async) once the session's work is committed
+    
+    Caches and indexes describe committed data, so repositories update them
+    here rather than after their own flush.
+    """
+    db.info.setdefault(AFTER_COMMIT, []).append(callback)
+
+
+async def commit(db: AsyncSession) -> None:
+    """Commit the session, then run the callbacks deferred until the commit"""
+    await db.commit()
+    for callback in db.info.pop(AFTER_COMMIT, []):
+        result = callback()
+        if inspect.isawaitable(result):
+            await result
+
+
+async def rollback(db: AsyncSession) -> None:
+    """Roll back the session and drop the callbacks of the discarded work"""
+    await db.rollback()
+    db.info.pop(AFTER_COMMIT, None)
+
+
+def request_session(request: Request) -> Optional[AsyncSession]:
+    """The session get_async_db opened for this request, if any"""
+    return getattr(request.state, "db", None)
+
+
+class UnitOfWorkRoute(APIRoute):
+    """One transaction per request: commit after the endpoint, roll back on errors
+    
+    Repositories only flush. The commit happens once the response is built but
+    before it is sent, so clients never see data that is not yet committed;
+    FastAPI closes yield dependencies only after sending the response.
+    A request that wrote keeps its user on the primary for a while.
+    """
+    
+    def get_route_handler(self) -> Callable[[Request], Awaitable[Response]]:
+        handler = super().get_route_handler()
+        
+        async def unit_of_work_handler(request: Request) -> Response:
+            try:
+                response = await handler(request)
+            except Exception:
+                db = request_session(request)
+                if db is not None:
+                    await rollback(db)
+                raise
+            
+            db = request_session(request)
+            if db is not None:
+                await commit(db)
+                if db.info.pop(WROTE, False):
+                    await stick_to_primary(request)
+            return response
+        
+        return unit_of_work_handler
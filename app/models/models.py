@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum, CheckConstraint, Index
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, ForeignKey, Enum, CheckConstraint, Index, DDL, event, text
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -18,6 +19,11 @@ class BookingStatus(str, enum.Enum):
     COMPLETED = "completed"
 
 
+class RecurrenceFrequency(str, enum.Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+
+
 class User(Base):
     __tablename__ = "users"
     
@@ -29,6 +35,7 @@ class User(Base):
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     bookings = relationship("Booking", back_populates="user", cascade="all, delete-orphan")
+    booking_series = relationship("BookingSeries", back_populates="user", cascade="all, delete-orphan")
 
 
 class Service(Base):
@@ -42,12 +49,29 @@ class Service(Base):
     is_active = Column(Boolean, default=True, nullable=False, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
+    # Review aggregates, maintained by ReviewRepository on every review write
+    rating_count = Column(Integer, default=0, nullable=False)
+    rating_sum = Column(Integer, default=0, nullable=False)
+    rating_average = Column(Float, default=0.0, nullable=False)
+    rating_1_count = Column(Integer, default=0, nullable=False)
+    rating_2_count = Column(Integer, default=0, nullable=False)
+    rating_3_count = Column(Integer, default=0, nullable=False)
+    rating_4_count = Column(Integer, default=0, nullable=False)
+    rating_5_count = Column(Integer, default=0, nullable=False)
+    
     bookings = relationship("Booking", back_populates="service", cascade="all, delete-orphan")
+    booking_series = relationship("BookingSeries", back_populates="service", cascade="all, delete-orphan")
     
     __table_args__ = (
         CheckConstraint('price >= 0', name='check_price_positive'),
         CheckConstraint('duration_minutes > 0', name='check_duration_positive'),
+        Index('idx_service_rating_id', 'rating_average', 'id'),
     )
+    
+    @property
+    def rating_histogram(self) -> dict:
+        """Number of reviews per star rating"""
+        return {rating: getattr(self, f"rating_{rating}_count") for rating in range(1, 6)}
 
 
 class Booking(Base):
@@ -59,15 +83,61 @@ class Booking(Base):
     start_time = Column(DateTime, nullable=False, index=True)
     end_time = Column(DateTime, nullable=False)
     status = Column(Enum(BookingStatus), default=BookingStatus.PENDING, nullable=False, index=True)
+    series_id = Column(Integer, ForeignKey("booking_series.id"), nullable=True, index=True)
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     
     user = relationship("User", back_populates="bookings")
     service = relationship("Service", back_populates="bookings")
+    series = relationship("BookingSeries", back_populates="bookings")
     review = relationship("Review", back_populates="booking", uselist=False, cascade="all, delete-orphan")
     
     __table_args__ = (
         CheckConstraint('end_time > start_time', name='check_time_valid'),
         Index('idx_booking_time_range', 'service_id', 'start_time', 'end_time'),
+        # Keyset pagination on (start_time, id), for admins and per user
+        Index('idx_booking_start_id', 'start_time', 'id'),
+        Index('idx_booking_user_start_id', 'user_id', 'start_time', 'id'),
+        # Postgres rejects overlapping active bookings per service (needs btree_gist)
+        ExcludeConstraint(
+            ('service_id', '='),
+            (text('tsrange(start_time, end_time)'), '&&'),
+            name='excl_booking_service_overlap',
+            using='gist',
+            where=text("status IN ('PENDING', 'CONFIRMED')")
+        ).ddl_if(dialect='postgresql'),
+    )
+
+
+event.listen(
+    Booking.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS btree_gist").execute_if(dialect="postgresql")
+)
+
+
+class BookingSeries(Base):
+    __tablename__ = "booking_series"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    service_id = Column(Integer, ForeignKey("services.id"), nullable=False, index=True)
+    start_time = Column(DateTime, nullable=False)
+    duration_minutes = Column(Integer, nullable=False)
+    frequency = Column(Enum(RecurrenceFrequency), nullable=False)
+    interval = Column(Integer, default=1, nullable=False)
+    count = Column(Integer, nullable=True)
+    until = Column(DateTime, nullable=True)
+    # Occurrences starting before this exist as bookings; datetime.max once all of them do
+    materialized_until = Column(DateTime, nullable=False, index=True)
+    is_active = Column(Boolean, default=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    user = relationship("User", back_populates="booking_series")
+    service = relationship("Service", back_populates="booking_series")
+    bookings = relationship("Booking", back_populates="series")
+    
+    __table_args__ = (
+        CheckConstraint('interval > 0', name='check_series_interval_positive'),
     )
 
 
@@ -84,4 +154,39 @@ class Review(Base):
     
     __table_args__ = (
         CheckConstraint('rating >= 1 AND rating <= 5', name='check_rating_range'),
-    )
\ No newline at end of file
+    )
+
+
+# Catalog search indexes live outside the ORM mapping: a generated tsvector
+# column on Postgres and an external-content FTS5 table on SQLite.
+SERVICE_SEARCH_DDL = {
+    "postgresql": [
+        "ALTER TABLE services ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', title), 'A') || "
+        "setweight(to_tsvector('english', description), 'B')) STORED",
+        "CREATE INDEX idx_service_search_vector ON services USING gin (search_vector)",
+    ],
+    "sqlite": [
+        "CREATE VIRTUAL TABLE IF NOT EXISTS services_fts USING fts5("
+        "title, description, content='services', content_rowid='id', tokenize='porter unicode61')",
+        "CREATE TRIGGER IF NOT EXISTS services_fts_insert AFTER INSERT ON services BEGIN "
+        "INSERT INTO services_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+        "CREATE TRIGGER IF NOT EXISTS services_fts_delete AFTER DELETE ON services BEGIN "
+        "INSERT INTO services_fts(services_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); END",
+        "CREATE TRIGGER IF NOT EXISTS services_fts_update AFTER UPDATE OF title, description ON services BEGIN "
+        "INSERT INTO services_fts(services_fts, rowid, title, description) "
+        "VALUES ('delete', old.id, old.title, old.description); "
+        "INSERT INTO services_fts(rowid, title, description) VALUES (new.id, new.title, new.description); END",
+    ],
+}
+
+for dialect, statements in SERVICE_SEARCH_DDL.items():
+    for statement in statements:
+        event.listen(Service.__table__, "after_create", DDL(statement).execute_if(dialect=dialect))
+
+event.listen(
+    Service.__table__,
+    "after_drop",
+    DDL("DROP TABLE IF EXISTS services_fts").execute_if(dialect="sqlite")
+)
@@ -1,46 +1,348 @@
-from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import Optional, List
+from sqlalchemy import Integer, Row, Select, bindparam, exists, func, insert, select, tuple_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload, raiseload, selectinload
+from sqlalchemy.orm.attributes import set_committed_value
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, List, Sequence, Tuple
 from datetime import datetime
+import enum
 
-from app.models.models import Booking, BookingStatus
+from app.core.interval_index import ServiceIntervals
+from app.core.pagination import DEFAULT_PAGE_SIZE
+from app.core.response_cache import response_cache
+from app.core.unit_of_work import after_commit, rollback
+from app.models.models import Booking, BookingStatus, Service
+from app.repositories.review_repository import ReviewRepository
+from app.repositories.service_repository import SERVICE_COLUMNS, service_row
+
+
+# Statuses that hold a time slot
+ACTIVE_STATUSES = [BookingStatus.PENDING, BookingStatus.CONFIRMED]
+
+# Columns written by the bookings export, in output order
+EXPORT_COLUMNS = (
+    Booking.id,
+    Booking.user_id,
+    Booking.service_id,
+    Booking.start_time,
+    Booking.end_time,
+    Booking.status,
+    Booking.created_at,
+)
+
+# Columns of a BookingResponse besides its service, in the order booking_row reads them
+BOOKING_COLUMNS = (
+    Booking.id,
+    Booking.user_id,
+    Booking.service_id,
+    Booking.start_time,
+    Booking.end_time,
+    Booking.status,
+    Booking.series_id,
+    Booking.created_at,
+)
+
+# Postgres exclusion constraint rejecting overlapping active bookings
+OVERLAP_CONSTRAINT = "excl_booking_service_overlap"
+
+
+class BookingConflictError(Exception):
+    """Raised when a booking would overlap an active booking of the same service"""
+
+
+class ServiceLoading(str, enum.Enum):
+    """How Booking.service is loaded alongside bookings"""
+    JOINED = "joined"  # LEFT OUTER JOIN in the same statement
+    SELECTIN = "selectin"  # one extra SELECT ... WHERE id IN (...) per result
+    RAISE = "raise"  # not loaded; accessing it is an error
+
+
+SERVICE_LOADERS = {
+    ServiceLoading.JOINED: joinedload,
+    ServiceLoading.SELECTIN: selectinload,
+    ServiceLoading.RAISE: raiseload,
+}
+
+# Hot queries are built once per shape (the optional criteria that apply) with
+# bindparam() placeholders and memoized. A call passes only its values, and
+# SQLAlchemy memoizes each statement's cache key, so the compiled SQL is found
+# without rebuilding or re-walking the statement.
+Statement = Tuple[Select, Dict[str, Any]]
+
+START_TIME = bindparam("start_time", type_=Booking.start_time.type)
+END_TIME = bindparam("end_time", type_=Booking.end_time.type)
+FETCH = bindparam("fetch", type_=Integer)
+
+# Listing filters by parameter name
+BOOKING_FILTERS = {
+    "user_id": Booking.user_id == bindparam("user_id"),
+    "status": Booking.status == bindparam("status"),
+    "from_date": Booking.start_time >= bindparam("from_date"),
+    "to_date": Booking.start_time <= bindparam("to_date"),
+}
+
+
+def booking_filters(
+    user_id: Optional[int],
+    status: Optional[BookingStatus],
+    from_date: Optional[datetime],
+    to_date: Optional[datetime]
+) -> Dict[str, Any]:
+    """Values of the BOOKING_FILTERS that apply"""
+    values = {"user_id": user_id, "status": status, "from_date": from_date, "to_date": to_date}
+    return {name: value for name, value in values.items() if value is not None}
+
+
+def booking_row(row: Sequence[Any]) -> Dict[str, Any]:
+    """BookingResponse fields from BOOKING_COLUMNS values followed by SERVICE_COLUMNS values"""
+    booking_id, user_id, service_id, start_time, end_time, status, series_id, created_at = row[:len(BOOKING_COLUMNS)]
+    return {
+        "id": booking_id,
+        "user_id": user_id,
+        "service_id": service_id,
+        "start_time": start_time,
+        "end_time": end_time,
+        "status": status,
+        "series_id": series_id,
+        "created_at": created_at,
+        "service": service_row(row, len(BOOKING_COLUMNS)),
+    }
+
+
+@lru_cache(maxsize=None)
+def _booking_page_query(filters: Tuple[str, ...], keyset: bool, service_loading: Optional[ServiceLoading]) -> Select:
+    if service_loading is None:
+        query = select(*BOOKING_COLUMNS, *SERVICE_COLUMNS).join(Booking.service)
+    else:
+        query = select(Booking).options(SERVICE_LOADERS[service_loading](Booking.service))
+    query = query.where(*(BOOKING_FILTERS[name] for name in filters))
+    if keyset:
+        after_start = bindparam("after_start", type_=Booking.start_time.type)
+        after_id = bindparam("after_id", type_=Integer)
+        query = query.where(tuple_(Booking.start_time, Booking.id) < tuple_(after_start, after_id))
+    return query.order_by(Booking.start_time.desc(), Booking.id.desc()).limit(FETCH)
+
+
+def booking_page_statement(
+    user_id: Optional[int] = None,
+    status: Optional[BookingStatus] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[Tuple[datetime, int]] = None,
+    service_loading: ServiceLoading = ServiceLoading.SELECTIN,
+    rows: bool = False
+) -> Statement:
+    """limit + 1 bookings, newest first, after the (start_time, id) keyset
+    
+    With rows, the statement selects BOOKING_COLUMNS and SERVICE_COLUMNS
+    instead of Booking entities and service_loading does not apply.
+    """
+    params = booking_filters(user_id, status, from_date, to_date)
+    query = _booking_page_query(tuple(params), after is not None, None if rows else service_loading)
+    if after is not None:
+        params["after_start"], params["after_id"] = after
+    params["fetch"] = limit + 1
+    return query, params
+
+
+@lru_cache(maxsize=None)
+def _conflict_query(exclude: bool, disjoint: bool) -> Select:
+    candidates = [
+        Booking.service_id == bindparam("service_id"),
+        Booking.status.in_(ACTIVE_STATUSES),
+        Booking.start_time < END_TIME
+    ]
+    
+    if exclude:
+        candidates.append(Booking.id != bindparam("exclude_booking_id"))
+    
+    if not disjoint:
+        return select(exists().where(*candidates, Booking.end_time > START_TIME))
+    
+    latest = select(Booking.end_time).where(*candidates).order_by(Booking.start_time.desc()).limit(1)
+    latest_end = latest.scalar_subquery()
+    return select(func.coalesce(latest_end > START_TIME, False))
+
+
+def conflict_statement(
+    service_id: int,
+    start_time: datetime,
+    end_time: datetime,
+    exclude_booking_id: Optional[int] = None,
+    disjoint: bool = False
+) -> Statement:
+    """Query returning whether an active booking overlaps [start_time, end_time)
+    
+    Overlap is start_time < :end AND end_time > :start. Pass disjoint=True only
+    when active bookings of a service are known never to overlap each other
+    (the Postgres exclusion constraint guarantees it): then only the latest one
+    starting before :end can satisfy end_time > :start, and one backward probe
+    of idx_booking_time_range finds it, whatever the number of earlier bookings.
+    """
+    params = {"service_id": service_id, "start_time": start_time, "end_time": end_time}
+    if exclude_booking_id:
+        params["exclude_booking_id"] = exclude_booking_id
+    return _conflict_query(bool(exclude_booking_id), disjoint), params
+
+
+@lru_cache(maxsize=None)
+def _busy_intervals_query(bounded: bool, disjoint: bool) -> Select:
+    service_id = bindparam("service_id")
+    query = select(Booking.start_time, Booking.end_time, Booking.id).where(
+        Booking.service_id == service_id,
+        Booking.status.in_(ACTIVE_STATUSES),
+        Booking.end_time > START_TIME
+    )
+    
+    if disjoint:
+        straddling_start = select(func.max(Booking.start_time)).where(
+            Booking.service_id == service_id,
+            Booking.status.in_(ACTIVE_STATUSES),
+            Booking.start_time < START_TIME
+        ).scalar_subquery()
+        query = query.where(Booking.start_time >= func.coalesce(straddling_start, START_TIME))
+    
+    if bounded:
+        query = query.where(Booking.start_time < END_TIME)
+    
+    return query.order_by(Booking.start_time)
+
+
+def busy_intervals_statement(
+    service_id: int,
+    start_time: datetime,
+    end_time: Optional[datetime] = None,
+    disjoint: bool = False
+) -> Statement:
+    """(start, end, id) of active bookings overlapping [start_time, end_time), by start
+    
+    With disjoint=True (as for conflict_statement) at most one active booking
+    can start before the window and still overlap it, so the scan starts at
+    that booking rather than at the service's first. Without end_time every
+    active booking ending after start_time is returned.
+    """
+    params = {"service_id": service_id, "start_time": start_time}
+    if end_time is not None:
+        params["end_time"] = end_time
+    return _busy_intervals_query(end_time is not None, disjoint), params
+
+
+@lru_cache(maxsize=None)
+def _slot_bookings_query() -> Select:
+    return select(Booking.service_id, Booking.start_time, Booking.end_time, Booking.id).where(
+        Booking.service_id.in_(bindparam("service_ids", expanding=True)),
+        Booking.status.in_(ACTIVE_STATUSES),
+        Booking.start_time < END_TIME,
+        Booking.end_time > START_TIME
+    )
+
+
+def slot_bookings_statement(
+    service_ids: Iterable[int],
+    start_time: datetime,
+    end_time: datetime
+) -> Statement:
+    """(service_id, start, end, id) of active bookings of the services overlapping [start_time, end_time)"""
+    return _slot_bookings_query(), {"service_ids": list(service_ids), "start_time": start_time, "end_time": end_time}
 
 
 class BookingRepository:
     """Booking repository for database operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_by_id(self, booking_id: int) -> Optional[Booking]:
+    @property
+    def enforces_overlap(self) -> bool:
+        """Whether the database itself rejects overlapping bookings"""
+        return self.db.bind.dialect.name == "postgresql"
+    
+    async def _check_overlap(
+        self,
+        service_id: int,
+        start_time: datetime,
+        end_time: datetime,
+        exclude_booking_id: Optional[int] = None
+    ) -> None:
+        """Raise BookingConflictError for overlaps detectable before writing
+        
+        On Postgres the exclusion constraint rejects overlaps on insert, so the
+        pre-check only runs where nothing else enforces them.
+        """
+        if not self.enforces_overlap and await self.check_conflict(service_id, start_time, end_time, exclude_booking_id):
+            raise BookingConflictError()
+    
+    @asynccontextmanager
+    async def _overlap_conflicts(self) -> AsyncIterator[None]:
+        """Translate an overlap constraint violation inside the block into BookingConflictError
+        
+        The failed statement leaves the transaction unusable, so the request's
+        work so far is rolled back.
+        """
+        try:
+            yield
+        except IntegrityError as exc:
+            await rollback(self.db)
+            if OVERLAP_CONSTRAINT in str(exc.orig):
+                raise BookingConflictError() from exc
+            raise
+    
+    async def get_by_id(
+        self,
+        booking_id: int,
+        service_loading: ServiceLoading = ServiceLoading.JOINED
+    ) -> Optional[Booking]:
         """Get booking by ID"""
-        return self.db.query(Booking).filter(Booking.id == booking_id).first()
+        return await self.db.get(
+            Booking,
+            booking_id,
+            options=[SERVICE_LOADERS[service_loading](Booking.service)]
+        )
     
-    def get_all(
+    async def get_all_rows(
         self,
         user_id: Optional[int] = None,
         status: Optional[BookingStatus] = None,
         from_date: Optional[datetime] = None,
-        to_date: Optional[datetime] = None
-    ) -> List[Booking]:
-        """Get all bookings with optional filters"""
-        query = self.db.query(Booking)
-        
-        if user_id is not None:
-            query = query.filter(Booking.user_id == user_id)
-        
-        if status is not None:
-            query = query.filter(Booking.status == status)
+        to_date: Optional[datetime] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Get a page of bookings (newest first) as BookingResponse-shaped dicts
         
-        if from_date is not None:
-            query = query.filter(Booking.start_time >= from_date)
-        
-        if to_date is not None:
-            query = query.filter(Booking.start_time <= to_date)
+        Keyset pagination on (start_time, id): pass the last row's key as
+        `after`. Returns up to limit + 1 rows so callers can detect a next page.
+        One joined query of only the response's columns, service included, runs
+        on the session's Core connection: no entities enter the identity map.
+        """
+        query, params = booking_page_statement(user_id, status, from_date, to_date, limit, after, rows=True)
+        conn = await self.db.connection()
+        result = await conn.execute(query, params)
+        return [booking_row(row) for row in result]
+    
+    async def stream_for_export(
+        self,
+        status: Optional[BookingStatus] = None,
+        from_date: Optional[datetime] = None,
+        to_date: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> AsyncIterator[Sequence[Row]]:
+        """Yield batches of flat booking rows ordered by (start_time, id)
         
-        return query.order_by(Booking.start_time.desc()).all()
+        Rows come from a server-side cursor batch_size at a time, so memory stays
+        flat however many bookings match.
+        """
+        params = booking_filters(None, status, from_date, to_date)
+        query = select(*EXPORT_COLUMNS).where(*(BOOKING_FILTERS[name] for name in params))
+        query = query.order_by(Booking.start_time, Booking.id).execution_options(yield_per=batch_size)
+        result = await self.db.stream(query, params)
+        async for batch in result.partitions():
+            yield batch
     
-    def check_conflict(
+    async def check_conflict(
         self,
         service_id: int,
         start_time: datetime,
@@ -48,40 +350,36 @@ class BookingRepository:
         exclude_booking_id: Optional[int] = None
     ) -> bool:
         """Check if there's a booking conflict"""
-        query = self.db.query(Booking).filter(
-            and_(
-                Booking.service_id == service_id,
-                Booking.status.in_([BookingStatus.PENDING, BookingStatus.CONFIRMED]),
-                or_(
-                    and_(
-                        Booking.start_time <= start_time,
-                        Booking.end_time > start_time
-                    ),
-                    and_(
-                        Booking.start_time < end_time,
-                        Booking.end_time >= end_time
-                    ),
-                    and_(
-                        Booking.start_time >= start_time,
-                        Booking.end_time <= end_time
-                    )
-                )
-            )
+        query, params = conflict_statement(
+            service_id, start_time, end_time, exclude_booking_id, disjoint=self.enforces_overlap
         )
-        
-        if exclude_booking_id:
-            query = query.filter(Booking.id != exclude_booking_id)
-        
-        return query.first() is not None
+        return await self.db.scalar(query, params)
+    
+    async def get_busy_intervals(
+        self,
+        service_id: int,
+        start_time: datetime,
+        end_time: Optional[datetime] = None
+    ) -> List[Tuple[datetime, datetime, int]]:
+        """Get (start, end, id) of active bookings overlapping [start_time, end_time), by start"""
+        query, params = busy_intervals_statement(service_id, start_time, end_time, disjoint=self.enforces_overlap)
+        result = await self.db.execute(query, params)
+        return [tuple(row) for row in result.all()]
     
-    def create(
+    async def create(
         self,
         user_id: int,
         service_id: int,
         start_time: datetime,
         end_time: datetime
     ) -> Booking:
-        """Create new booking"""
+        """Create new booking
+        
+        Raises BookingConflictError if the slot overlaps an active booking. On
+        Postgres the exclusion constraint decides this within the INSERT itself.
+        """
+        await self._check_overlap(service_id, start_time, end_time)
+        
         booking = Booking(
             user_id=user_id,
             service_id=service_id,
@@ -90,21 +388,115 @@ class BookingRepository:
             status=BookingStatus.PENDING
         )
         self.db.add(booking)
-        self.db.commit()
-        self.db.refresh(booking)
+        async with self._overlap_conflicts():
+            await self.db.flush()
+        # The endpoint loaded the service, so this is an identity map hit
+        set_committed_value(booking, "service", await self.db.get(Service, service_id))
         return booking
     
-    def update(self, booking: Booking, **kwargs) -> Booking:
-        """Update booking"""
-        for key, value in kwargs.items():
-            if value is not None:
-                setattr(booking, key, value)
+    async def find_conflicts(self, slots: Sequence[Tuple[int, datetime, datetime]]) -> List[bool]:
+        """Whether each (service_id, start, end) slot is unavailable
+        
+        Slots are checked, in order, against active bookings fetched with one
+        range query and against the available slots before them.
+        """
+        if not slots:
+            return []
+        
+        service_ids = {service_id for service_id, _, _ in slots}
+        query, params = slot_bookings_statement(
+            service_ids,
+            min(start_time for _, start_time, _ in slots),
+            max(end_time for _, _, end_time in slots)
+        )
+        result = await self.db.execute(query, params)
+        busy = {service_id: [] for service_id in service_ids}
+        for service_id, start_time, end_time, booking_id in result.all():
+            busy[service_id].append((start_time, end_time, booking_id))
+        intervals = {service_id: ServiceIntervals(rows) for service_id, rows in busy.items()}
+        
+        conflicts = []
+        for position, (service_id, start_time, end_time) in enumerate(slots):
+            conflict = intervals[service_id].overlaps(start_time, end_time)
+            if not conflict:
+                # Negative placeholder IDs cannot clash with stored bookings
+                intervals[service_id].add(-position - 1, start_time, end_time)
+            conflicts.append(conflict)
+        return conflicts
+    
+    async def create_many(
+        self,
+        user_id: int,
+        slots: Sequence[Tuple[int, datetime, datetime]],
+        series_id: Optional[int] = None
+    ) -> List[Optional[Booking]]:
+        """Create bookings for (service_id, start, end) slots
+        
+        Unavailable slots (see find_conflicts) yield None; the rest go in as one
+        multi-row INSERT ... RETURNING. Raises BookingConflictError, inserting
+        nothing, if the Postgres constraint still catches a concurrent booking.
+        """
+        conflicts = await self.find_conflicts(slots)
+        accepted = [position for position, conflict in enumerate(conflicts) if not conflict]
+        
+        bookings: List[Optional[Booking]] = [None] * len(slots)
+        if not accepted:
+            return bookings
+        
+        rows = [
+            {
+                "user_id": user_id,
+                "service_id": slots[position][0],
+                "start_time": slots[position][1],
+                "end_time": slots[position][2],
+                "status": BookingStatus.PENDING,
+                "series_id": series_id,
+            }
+            for position in accepted
+        ]
+        async with self._overlap_conflicts():
+            result = await self.db.scalars(insert(Booking).returning(Booking), rows)
+        # Accepted slots are disjoint per service, so (service, start) finds each row's slot
+        positions = {(slots[position][0], slots[position][1]): position for position in accepted}
+        for booking in result.all():
+            # Services are normally already in the session, so this is not a query
+            set_committed_value(booking, "service", await self.db.get(Service, booking.service_id))
+            bookings[positions[(booking.service_id, booking.start_time)]] = booking
+        return bookings
+    
+    async def update(self, booking: Booking, **kwargs) -> Booking:
+        """Update booking
+        
+        Raises BookingConflictError if the updated booking is active and overlaps
+        another active booking of the same service.
+        """
+        changes = {key: value for key, value in kwargs.items() if value is not None}
+        for key, value in changes.items():
+            setattr(booking, key, value)
+        
+        if changes.keys() & {"start_time", "end_time", "status"} and booking.status in ACTIVE_STATUSES:
+            try:
+                await self._check_overlap(
+                    booking.service_id,
+                    booking.start_time,
+                    booking.end_time,
+                    exclude_booking_id=booking.id
+                )
+            except BookingConflictError:
+                await rollback(self.db)
+                raise
         
-        self.db.commit()
-        self.db.refresh(booking)
+        async with self._overlap_conflicts():
+            await self.db.flush()
         return booking
     
-    def delete(self, booking: Booking) -> None:
+    async def delete(self, booking: Booking) -> None:
         """Delete booking"""
-        self.db.delete(booking)
-        self.db.commit()
\ No newline at end of file
+        await self.db.delete(booking)
+        # The delete cascade loaded the booking's review; drop it from the ratings too
+        reviewed = booking.review is not None
+        if reviewed:
+            await ReviewRepository(self.db).apply_rating(booking.id, removed=booking.review.rating)
+        await self.db.flush()
+        if reviewed:
+            after_commit(self.db, lambda: response_cache.invalidate("services", "reviews"))
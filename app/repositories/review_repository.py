@@ -1,49 +1,135 @@
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy import Float, Integer, Select, bindparam, cast, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from functools import lru_cache
+from typing import Any, Dict, Optional, List, Tuple
 
-from app.models.models import Review
+from app.core.pagination import DEFAULT_PAGE_SIZE
+from app.core.response_cache import response_cache
+from app.core.unit_of_work import after_commit
+from app.models.models import Review, Booking, Service
 from app.schemas.schemas import ReviewCreate, ReviewUpdate
 
 
+@lru_cache(maxsize=None)
+def _review_by_booking_query() -> Select:
+    return select(Review).where(Review.booking_id == bindparam("booking_id"))
+
+
+def review_by_booking_statement(booking_id: int) -> Tuple[Select, Dict[str, Any]]:
+    return _review_by_booking_query(), {"booking_id": booking_id}
+
+
+@lru_cache(maxsize=None)
+def _review_page_query(keyset: bool) -> Select:
+    query = select(Review).join(Review.booking).where(Booking.service_id == bindparam("service_id"))
+    
+    if keyset:
+        query = query.where(Review.id > bindparam("after_id"))
+    
+    return query.order_by(Review.id).limit(bindparam("fetch", type_=Integer))
+
+
+def review_page_statement(
+    service_id: int,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after_id: Optional[int] = None
+) -> Tuple[Select, Dict[str, Any]]:
+    """limit + 1 reviews of a service ordered by ID, after after_id"""
+    params = {"service_id": service_id, "fetch": limit + 1}
+    if after_id is not None:
+        params["after_id"] = after_id
+    return _review_page_query(after_id is not None), params
+
+
 class ReviewRepository:
     """Review repository for database operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_by_id(self, review_id: int) -> Optional[Review]:
+    async def apply_rating(
+        self,
+        booking_id: int,
+        added: Optional[int] = None,
+        removed: Optional[int] = None
+    ) -> None:
+        """Adjust the reviewed service's rating aggregates in the current transaction
+        
+        Increments are computed by the database, so concurrent reviews of the same
+        service cannot lose updates.
+        """
+        if added == removed:
+            return
+        
+        count = Service.rating_count + int(added is not None) - int(removed is not None)
+        total = Service.rating_sum + (added or 0) - (removed or 0)
+        values = {
+            "rating_count": count,
+            "rating_sum": total,
+            "rating_average": func.coalesce(cast(total, Float) / func.nullif(count, 0), 0.0),
+        }
+        for rating, delta in ((added, 1), (removed, -1)):
+            if rating is not None:
+                column = getattr(Service, f"rating_{rating}_count")
+                values[column.key] = column + delta
+        
+        service_id = select(Booking.service_id).where(Booking.id == booking_id).scalar_subquery()
+        await self.db.execute(
+            update(Service)
+            .where(Service.id == service_id)
+            .values(**values)
+            .execution_options(synchronize_session=False)
+        )
+    
+    async def get_by_id(self, review_id: int) -> Optional[Review]:
         """Get review by ID"""
-        return self.db.query(Review).filter(Review.id == review_id).first()
+        return await self.db.get(Review, review_id)
     
-    def get_by_booking_id(self, booking_id: int) -> Optional[Review]:
+    async def get_by_booking_id(self, booking_id: int) -> Optional[Review]:
         """Get review by booking ID"""
-        return self.db.query(Review).filter(Review.booking_id == booking_id).first()
+        query, params = review_by_booking_statement(booking_id)
+        result = await self.db.execute(query, params)
+        return result.scalars().first()
     
-    def get_by_service_id(self, service_id: int) -> List[Review]:
-        """Get all reviews for a service"""
-        return self.db.query(Review).join(Review.booking).filter(
-            Review.booking.has(service_id=service_id)
-        ).all()
+    async def get_by_service_id(
+        self,
+        service_id: int,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after_id: Optional[int] = None
+    ) -> List[Review]:
+        """Get a page of reviews for a service ordered by ID
+        
+        Returns up to limit + 1 rows so callers can detect a next page.
+        """
+        query, params = review_page_statement(service_id, limit, after_id)
+        result = await self.db.execute(query, params)
+        return result.scalars().all()
     
-    def create(self, review_data: ReviewCreate) -> Review:
+    async def create(self, review_data: ReviewCreate) -> Review:
         """Create new review"""
         review = Review(**review_data.model_dump())
         self.db.add(review)
-        self.db.commit()
-        self.db.refresh(review)
+        await self.apply_rating(review.booking_id, added=review.rating)
+        await self.db.flush()
+        # Ratings on service responses change along with the reviews
+        after_commit(self.db, lambda: response_cache.invalidate("services", "reviews"))
         return review
     
-    def update(self, review: Review, review_data: ReviewUpdate) -> Review:
+    async def update(self, review: Review, review_data: ReviewUpdate) -> Review:
         """Update review"""
+        previous_rating = review.rating
         update_data = review_data.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(review, key, value)
         
-        self.db.commit()
-        self.db.refresh(review)
+        await self.apply_rating(review.booking_id, added=review.rating, removed=previous_rating)
+        await self.db.flush()
+        after_commit(self.db, lambda: response_cache.invalidate("services", "reviews"))
         return review
     
-    def delete(self, review: Review) -> None:
+    async def delete(self, review: Review) -> None:
         """Delete review"""
-        self.db.delete(review)
-        self.db.commit()
\ No newline at end of file
+        await self.db.delete(review)
+        await self.apply_rating(review.booking_id, removed=review.rating)
+        await self.db.flush()
+        after_commit(self.db, lambda: response_cache.invalidate("services", "reviews"))
@@ -0,0 +1,130 @@
+from sqlalchemy import inspect, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Tuple
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.models.models import Booking, BookingSeries, BookingStatus
+from app.repositories.booking_repository import ACTIVE_STATUSES, BookingConflictError, BookingRepository
+from app.services.recurrence import last_occurrence_start, occurrence_starts, series_step
+
+
+class SeriesConflictError(BookingConflictError):
+    """Raised when occurrences of a new series overlap active bookings"""
+    
+    def __init__(self, starts: List[datetime]):
+        super().__init__()
+        self.starts = starts
+
+
+# materialized_until of a series whose every occurrence exists as a booking
+SERIES_COMPLETE = datetime.max
+
+
+def horizon_end() -> datetime:
+    """End of the rolling window in which series occurrences exist as bookings"""
+    return datetime.utcnow() + timedelta(days=settings.SERIES_HORIZON_DAYS)
+
+
+class BookingSeriesRepository:
+    """Booking series repository for database operations"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    def slots(
+        self,
+        series: BookingSeries,
+        window_start: datetime,
+        window_end: datetime
+    ) -> List[Tuple[int, datetime, datetime]]:
+        """(service_id, start, end) of the series' occurrences starting in the window"""
+        duration = timedelta(minutes=series.duration_minutes)
+        starts = occurrence_starts(
+            series.start_time,
+            series_step(series.frequency.value, series.interval),
+            series.count,
+            series.until,
+            window_start,
+            window_end
+        )
+        return [(series.service_id, start_time, start_time + duration) for start_time in starts]
+    
+    async def get_by_id(self, series_id: int) -> Optional[BookingSeries]:
+        """Get booking series by ID"""
+        return await self.db.get(BookingSeries, series_id)
+    
+    async def get_due(self, horizon_end: datetime) -> List[BookingSeries]:
+        """Get active series not yet materialized up to horizon_end
+        
+        Completed series (materialized_until = SERIES_COMPLETE) are never due.
+        """
+        result = await self.db.execute(
+            select(BookingSeries).where(
+                BookingSeries.is_active.is_(True),
+                BookingSeries.materialized_until < horizon_end
+            ).order_by(BookingSeries.id)
+        )
+        return result.scalars().all()
+    
+    async def create(self, user_id: int, **fields) -> BookingSeries:
+        """Create a series and materialize it up to the horizon
+        
+        Every occurrence, however far ahead, is checked with one batched
+        overlap query; raises SeriesConflictError if any is unavailable.
+        """
+        series = BookingSeries(user_id=user_id, materialized_until=fields["start_time"], **fields)
+        slots = self.slots(series, series.start_time, datetime.max)
+        conflicts = await BookingRepository(self.db).find_conflicts(slots)
+        if any(conflicts):
+            raise SeriesConflictError([start for (_, start, _), conflict in zip(slots, conflicts) if conflict])
+        
+        self.db.add(series)
+        await self.db.flush()
+        await self.materialize(series, horizon_end())
+        return series
+    
+    async def materialize(self, series: BookingSeries, horizon_end: datetime) -> int:
+        """Create bookings for occurrences up to horizon_end
+        
+        Occurrences taken by another booking since the series was created are
+        skipped. Once the final occurrence is booked the series is marked
+        complete. Returns the number of bookings created. Raises
+        BookingConflictError, creating nothing, if a concurrent booking collides
+        on insert.
+        """
+        if horizon_end <= series.materialized_until:
+            return 0
+        
+        slots = self.slots(series, series.materialized_until, horizon_end)
+        last_start = last_occurrence_start(
+            series.start_time,
+            series_step(series.frequency.value, series.interval),
+            series.count,
+            series.until
+        )
+        complete = last_start is not None and last_start < horizon_end
+        series.materialized_until = SERIES_COMPLETE if complete else horizon_end
+        try:
+            bookings = await BookingRepository(self.db).create_many(series.user_id, slots, series_id=series.id)
+        except BookingConflictError:
+            # The rollback expired a stored series; reload it so callers can carry on
+            if inspect(series).persistent:
+                await self.db.refresh(series)
+            raise
+        return sum(1 for booking in bookings if booking)
+    
+    async def cancel(self, series: BookingSeries) -> None:
+        """Stop the series and cancel its upcoming active bookings"""
+        series.is_active = False
+        await self.db.execute(
+            update(Booking)
+            .where(
+                Booking.series_id == series.id,
+                Booking.start_time > datetime.utcnow(),
+                Booking.status.in_(ACTIVE_STATUSES)
+            )
+            .values(status=BookingStatus.CANCELLED)
+            .execution_options(synchronize_session=False)
+        )
+        await self.db.flush()
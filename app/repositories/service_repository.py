@@ -1,66 +1,255 @@
-from sqlalchemy.orm import Session
-from typing import Optional, List
+from sqlalchemy import Integer, Select, and_, bindparam, column, func, insert, literal_column, or_, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+from functools import lru_cache
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, List, Sequence, Tuple
+import re
 
+from app.core.pagination import DEFAULT_PAGE_SIZE
+from app.core.response_cache import response_cache
+from app.core.unit_of_work import after_commit
 from app.models.models import Service
-from app.schemas.schemas import ServiceCreate, ServiceUpdate
+from app.schemas.schemas import ServiceCreate, ServiceUpdate, ServiceSort
+
+SEARCH_TERM = re.compile(r"[^\W_]+")
+
+
+def search_terms(q: str) -> List[str]:
+    """Split free text into word terms that are safe inside a full-text query"""
+    return SEARCH_TERM.findall(q.lower())
+
+
+# Columns of a ServiceResponse, in the order service_row reads them
+SERVICE_COLUMNS = (
+    Service.id,
+    Service.title,
+    Service.description,
+    Service.price,
+    Service.duration_minutes,
+    Service.is_active,
+    Service.created_at,
+    Service.rating_average,
+    Service.rating_count,
+    Service.rating_1_count,
+    Service.rating_2_count,
+    Service.rating_3_count,
+    Service.rating_4_count,
+    Service.rating_5_count,
+)
+
+
+def service_row(row: Sequence[Any], offset: int = 0) -> Dict[str, Any]:
+    """ServiceResponse fields from the SERVICE_COLUMNS values at row[offset:]"""
+    (
+        service_id, title, description, price, duration_minutes, is_active, created_at,
+        rating_average, rating_count, one, two, three, four, five
+    ) = row[offset:offset + len(SERVICE_COLUMNS)]
+    return {
+        "id": service_id,
+        "title": title,
+        "description": description,
+        "price": price,
+        "duration_minutes": duration_minutes,
+        "is_active": is_active,
+        "created_at": created_at,
+        "rating_average": rating_average,
+        "rating_count": rating_count,
+        "rating_histogram": {1: one, 2: two, 3: three, 4: four, 5: five},
+    }
+
+
+# Filters of the catalog listing and search by parameter name
+SERVICE_FILTERS = {
+    "price_min": Service.price >= bindparam("price_min"),
+    "price_max": Service.price <= bindparam("price_max"),
+    "active": Service.is_active == bindparam("active"),
+    "min_rating": Service.rating_average >= bindparam("min_rating"),
+}
+
+
+def service_filters(
+    price_min: Optional[float],
+    price_max: Optional[float],
+    active: Optional[bool],
+    min_rating: Optional[float] = None
+) -> Dict[str, Any]:
+    """Values of the SERVICE_FILTERS that apply"""
+    values = {"price_min": price_min, "price_max": price_max, "active": active, "min_rating": min_rating}
+    return {name: value for name, value in values.items() if value is not None}
+
+
+@lru_cache(maxsize=None)
+def _services_by_ids_query() -> Select:
+    return select(Service).where(Service.id.in_(bindparam("service_ids", expanding=True)))
+
+
+def services_by_ids_statement(service_ids: Iterable[int]) -> Tuple[Select, Dict[str, Any]]:
+    """The services with the given IDs"""
+    return _services_by_ids_query(), {"service_ids": list(set(service_ids))}
+
+
+@lru_cache(maxsize=None)
+def _service_page_query(filters: Tuple[str, ...], sort: ServiceSort, keyset: bool, rows: bool) -> Select:
+    query = select(*SERVICE_COLUMNS) if rows else select(Service)
+    query = query.where(*(SERVICE_FILTERS[name] for name in filters))
+    after_id = bindparam("after_id", type_=Integer)
+    
+    if sort == ServiceSort.RATING:
+        if keyset:
+            after_rating = bindparam("after_rating", type_=Service.rating_average.type)
+            query = query.where(or_(
+                Service.rating_average < after_rating,
+                and_(Service.rating_average == after_rating, Service.id > after_id)
+            ))
+        query = query.order_by(Service.rating_average.desc(), Service.id)
+    else:
+        if keyset:
+            query = query.where(Service.id > after_id)
+        query = query.order_by(Service.id)
+    
+    return query.limit(bindparam("fetch", type_=Integer))
+
+
+def service_page_statement(
+    price_min: Optional[float] = None,
+    price_max: Optional[float] = None,
+    active: Optional[bool] = None,
+    min_rating: Optional[float] = None,
+    sort: ServiceSort = ServiceSort.ID,
+    limit: int = DEFAULT_PAGE_SIZE,
+    after: Optional[tuple] = None,
+    rows: bool = False
+) -> Tuple[Select, Dict[str, Any]]:
+    """limit + 1 services in `sort` order after the keyset `after`
+    
+    With rows, the statement selects SERVICE_COLUMNS instead of Service entities.
+    """
+    params = service_filters(price_min, price_max, active, min_rating)
+    query = _service_page_query(tuple(params), sort, after is not None, rows)
+    if after is not None:
+        if sort == ServiceSort.RATING:
+            params["after_rating"], params["after_id"] = after
+        else:
+            params["after_id"] = after[0]
+    params["fetch"] = limit + 1
+    return query, params
 
 
 class ServiceRepository:
     """Service repository for database operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_by_id(self, service_id: int) -> Optional[Service]:
+    async def get_by_id(self, service_id: int) -> Optional[Service]:
         """Get service by ID"""
-        return self.db.query(Service).filter(Service.id == service_id).first()
+        return await self.db.get(Service, service_id)
     
-    def get_all(
+    async def get_by_ids(self, service_ids: Iterable[int]) -> List[Service]:
+        """Get the services with the given IDs in one query"""
+        query, params = services_by_ids_statement(service_ids)
+        result = await self.db.execute(query, params)
+        return result.scalars().all()
+    
+    async def get_all_rows(
         self,
-        q: Optional[str] = None,
         price_min: Optional[float] = None,
         price_max: Optional[float] = None,
-        active: Optional[bool] = None
-    ) -> List[Service]:
-        """Get all services with optional filters"""
-        query = self.db.query(Service)
+        active: Optional[bool] = None,
+        min_rating: Optional[float] = None,
+        sort: ServiceSort = ServiceSort.ID,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Optional[tuple] = None
+    ) -> List[Dict[str, Any]]:
+        """Get a page of services with optional filters, as ServiceResponse-shaped dicts
         
-        if q:
-            query = query.filter(
-                (Service.title.ilike(f"%{q}%")) | 
-                (Service.description.ilike(f"%{q}%"))
-            )
+        Ordered by ID, or by average rating (highest first) then ID. `after` is the
+        keyset of the previous page's last row: (id,) or (rating_average, id).
+        Returns up to limit + 1 rows so callers can detect a next page. Selects
+        only the response's columns on the session's Core connection, so no
+        entities enter the identity map.
+        """
+        query, params = service_page_statement(
+            price_min, price_max, active, min_rating, sort, limit, after, rows=True
+        )
+        conn = await self.db.connection()
+        result = await conn.execute(query, params)
+        return [service_row(row) for row in result]
+    
+    async def search(
+        self,
+        terms: List[str],
+        price_min: Optional[float] = None,
+        price_max: Optional[float] = None,
+        active: Optional[bool] = None,
+        min_rating: Optional[float] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+        after: Optional[Tuple[float, int]] = None
+    ) -> List[Tuple[Service, float]]:
+        """Get a page of (service, rank) matching every term as a word prefix, best first
         
-        if price_min is not None:
-            query = query.filter(Service.price >= price_min)
+        Uses the GIN-indexed search_vector column on Postgres and the services_fts
+        FTS5 table elsewhere. Returns up to limit + 1 rows so callers can detect a
+        next page.
+        """
+        if self.db.bind.dialect.name == "postgresql":
+            search_vector = literal_column("services.search_vector")
+            tsquery = func.to_tsquery("english", " & ".join(f"{term}:*" for term in terms))
+            rank = func.ts_rank(search_vector, tsquery)
+            query = select(Service, rank.label("rank")).where(search_vector.op("@@")(tsquery))
+        else:
+            fts = table("services_fts", column("rowid"))
+            rank = -func.bm25(literal_column("services_fts"), 2.0, 1.0)
+            query = select(Service, rank.label("rank")).join(fts, fts.c.rowid == Service.id).where(
+                literal_column("services_fts").op("MATCH")(" ".join(f'"{term}"*' for term in terms))
+            )
         
-        if price_max is not None:
-            query = query.filter(Service.price <= price_max)
+        params = service_filters(price_min, price_max, active, min_rating)
+        query = query.where(*(SERVICE_FILTERS[name] for name in params))
         
-        if active is not None:
-            query = query.filter(Service.is_active == active)
+        if after is not None:
+            after_rank, after_id = after
+            query = query.where(or_(rank < after_rank, and_(rank == after_rank, Service.id > after_id)))
         
-        return query.all()
+        result = await self.db.execute(query.order_by(rank.desc(), Service.id).limit(limit + 1), params)
+        return [tuple(row) for row in result.all()]
     
-    def create(self, service_data: ServiceCreate) -> Service:
+    async def create(self, service_data: ServiceCreate) -> Service:
         """Create new service"""
         service = Service(**service_data.model_dump())
         self.db.add(service)
-        self.db.commit()
-        self.db.refresh(service)
+        await self.db.flush()
+        after_commit(self.db, lambda: response_cache.invalidate("services"))
         return service
     
-    def update(self, service: Service, service_data: ServiceUpdate) -> Service:
+    async def create_many(self, batches: AsyncIterator[List[Dict[str, Any]]]) -> int:
+        """Insert batches of validated service rows
+        
+        Each batch is one executemany of the same cached INSERT; a multi-row
+        VALUES statement would be recompiled for every batch. Nothing is
+        refreshed. Returns the number of services created.
+        """
+        created = 0
+        async for rows in batches:
+            if rows:
+                await self.db.execute(insert(Service), rows)
+                created += len(rows)
+        
+        if created:
+            after_commit(self.db, lambda: response_cache.invalidate("services"))
+        return created
+    
+    async def update(self, service: Service, service_data: ServiceUpdate) -> Service:
         """Update service"""
         update_data = service_data.model_dump(exclude_unset=True)
         for key, value in update_data.items():
             setattr(service, key, value)
         
-        self.db.commit()
-        self.db.refresh(service)
+        await self.db.flush()
+        after_commit(self.db, lambda: response_cache.invalidate("services"))
         return service
     
-    def delete(self, service: Service) -> None:
+    async def delete(self, service: Service) -> None:
         """Delete service"""
-        self.db.delete(service)
-        self.db.commit()
\ No newline at end of file
+        await self.db.delete(service)
+        await self.db.flush()
+        after_commit(self.db, lambda: response_cache.invalidate("services", "reviews"))
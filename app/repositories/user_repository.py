@@ -1,25 +1,50 @@
-from sqlalchemy.orm import Session
-from typing import Optional
+from sqlalchemy import Select, bindparam, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
 
+from app.core.cache import user_cache
+from app.core.unit_of_work import after_commit
 from app.models.models import User
 from app.schemas.schemas import UserRegister, UserUpdate
 
 
+@lru_cache(maxsize=None)
+def _user_query(column: str) -> Select:
+    return select(User).where(getattr(User, column) == bindparam("value"))
+
+
+def user_by_id_statement(user_id: int) -> Tuple[Select, Dict[str, Any]]:
+    return _user_query("id"), {"value": user_id}
+
+
+def user_by_email_statement(email: str) -> Tuple[Select, Dict[str, Any]]:
+    return _user_query("email"), {"value": email}
+
+
 class UserRepository:
     """User repository for database operations"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
     
-    def get_by_id(self, user_id: int) -> Optional[User]:
-        """Get user by ID"""
-        return self.db.query(User).filter(User.id == user_id).first()
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        """Get user by ID
+        
+        Runs on user cache misses in a fresh session, where Session.get's
+        identity map lookup rarely hits; the memoized statement is cheaper.
+        """
+        query, params = user_by_id_statement(user_id)
+        result = await self.db.execute(query, params)
+        return result.scalars().first()
     
-    def get_by_email(self, email: str) -> Optional[User]:
+    async def get_by_email(self, email: str) -> Optional[User]:
         """Get user by email"""
-        return self.db.query(User).filter(User.email == email).first()
+        query, params = user_by_email_statement(email)
+        result = await self.db.execute(query, params)
+        return result.scalars().first()
     
-    def create(self, user_data: UserRegister, password_hash: str) -> User:
+    async def create(self, user_data: UserRegister, password_hash: str) -> User:
         """Create new user"""
         user = User(
             name=user_data.name,
@@ -27,17 +52,16 @@ class UserRepository:
             password_hash=password_hash
         )
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.flush()
         return user
     
-    def update(self, user: User, user_data: UserUpdate) -> User:
+    async def update(self, user: User, user_data: UserUpdate) -> User:
         """Update user"""
         if user_data.name is not None:
             user.name = user_data.name
         if user_data.email is not None:
             user.email = user_data.email
         
-        self.db.commit()
-        self.db.refresh(user)
-        return user
\ No newline at end of file
+        await self.db.flush()
+        after_commit(self.db, lambda: user_cache.invalidate(user.id))
+        return user
@@ -1,9 +1,16 @@
-from pydantic import BaseModel, EmailStr, Field, field_validator
-from typing import Optional
+from pydantic import BaseModel, EmailStr, Field, field_validator, model_validator
+from typing import Dict, Generic, List, Optional, TypeVar
 from datetime import datetime
 from enum import Enum
 
 
+T = TypeVar("T")
+
+MAX_BULK_BOOKINGS = 100
+MAX_SERIES_OCCURRENCES = 1000
+MAX_IMPORT_ERRORS = 100
+
+
 class UserRole(str, Enum):
     USER = "user"
     ADMIN = "admin"
@@ -16,6 +23,27 @@ class BookingStatus(str, Enum):
     COMPLETED = "completed"
 
 
+class RecurrenceFrequency(str, Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+
+
+class ServiceSort(str, Enum):
+    ID = "id"
+    RATING = "rating"
+
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    CSV = "csv"
+
+
+class ImportFormat(str, Enum):
+    CSV = "csv"
+    NDJSON = "ndjson"
+    JSON = "json"
+
+
 # Auth schemas
 class UserRegister(BaseModel):
     name: str = Field(..., min_length=1, max_length=100)
@@ -50,6 +78,19 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class UserPrincipal(BaseModel):
+    """Authenticated user snapshot, cached between requests"""
+    id: int
+    name: str
+    email: str
+    role: UserRole
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+        frozen = True
+
+
 class UserUpdate(BaseModel):
     name: Optional[str] = Field(None, min_length=1, max_length=100)
     email: Optional[EmailStr] = None
@@ -80,11 +121,38 @@ class ServiceResponse(BaseModel):
     duration_minutes: int
     is_active: bool
     created_at: datetime
+    rating_average: float
+    rating_count: int
+    rating_histogram: Dict[int, int]
     
     class Config:
         from_attributes = True
 
 
+class ServiceImportError(BaseModel):
+    row: int
+    field: Optional[str] = None
+    message: str
+
+
+class ServiceImportResponse(BaseModel):
+    imported: int
+    rejected: int
+    errors: List[ServiceImportError]
+
+
+class AvailabilitySlot(BaseModel):
+    start_time: datetime
+    end_time: datetime
+
+
+class AvailabilityResponse(BaseModel):
+    service_id: int
+    duration_minutes: int
+    granularity_minutes: int
+    slots: List[AvailabilitySlot]
+
+
 # Booking schemas
 class BookingCreate(BaseModel):
     service_id: int
@@ -97,6 +165,10 @@ class BookingCreate(BaseModel):
         return v
 
 
+class BookingBulkCreate(BaseModel):
+    items: List[BookingCreate] = Field(..., min_length=1, max_length=MAX_BULK_BOOKINGS)
+
+
 class BookingUpdate(BaseModel):
     start_time: Optional[datetime] = None
     status: Optional[BookingStatus] = None
@@ -115,6 +187,7 @@ class BookingResponse(BaseModel):
     start_time: datetime
     end_time: datetime
     status: BookingStatus
+    series_id: Optional[int] = None
     created_at: datetime
     service: Optional[ServiceResponse] = None
     
@@ -122,6 +195,65 @@ class BookingResponse(BaseModel):
         from_attributes = True
 
 
+class BookingBulkItemResult(BaseModel):
+    index: int
+    status_code: int
+    booking: Optional[BookingResponse] = None
+    detail: Optional[str] = None
+
+
+class BookingBulkResponse(BaseModel):
+    created: int
+    results: List[BookingBulkItemResult]
+
+
+# Booking series schemas
+class BookingSeriesCreate(BaseModel):
+    service_id: int
+    start_time: datetime
+    frequency: RecurrenceFrequency
+    interval: int = Field(1, ge=1, le=52)
+    count: Optional[int] = Field(None, ge=1, le=MAX_SERIES_OCCURRENCES)
+    until: Optional[datetime] = None
+    
+    @field_validator('start_time')
+    def validate_start_time(cls, v):
+        if v < datetime.utcnow():
+            raise ValueError('start_time must be in the future')
+        return v
+    
+    @model_validator(mode='after')
+    def validate_end(self):
+        if (self.count is None) == (self.until is None):
+            raise ValueError('exactly one of count or until is required')
+        if self.until is not None and self.until < self.start_time:
+            raise ValueError('until must not be before start_time')
+        return self
+
+
+class BookingSeriesResponse(BaseModel):
+    id: int
+    user_id: int
+    service_id: int
+    start_time: datetime
+    duration_minutes: int
+    frequency: RecurrenceFrequency
+    interval: int
+    count: Optional[int]
+    until: Optional[datetime]
+    materialized_until: datetime
+    is_active: bool
+    created_at: datetime
+    
+    class Config:
+        from_attributes = True
+
+
+class SeriesMaterializeResponse(BaseModel):
+    series: int
+    bookings_created: int
+
+
 # Review schemas
 class ReviewCreate(BaseModel):
     booking_id: int
@@ -142,4 +274,10 @@ class ReviewResponse(BaseModel):
     created_at: datetime
     
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+
+# Pagination schemas
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,44 @@
+from datetime import datetime, timedelta
+from typing import List, Sequence, Tuple
+
+
+def align_up(moment: datetime, origin: datetime, granularity: timedelta) -> datetime:
+    """Round a moment up onto the grid origin + k * granularity"""
+    steps = -(-(moment - origin) // granularity)
+    return origin + max(steps, 0) * granularity
+
+
+def free_slots(
+    busy: Sequence[Tuple],
+    window_start: datetime,
+    window_end: datetime,
+    duration: timedelta,
+    granularity: timedelta
+) -> List[Tuple[datetime, datetime]]:
+    """Sweep candidate slots against busy (start, end, ...) intervals sorted by start
+    
+    Candidates start on a granularity grid anchored at midnight of window_start.
+    Busy intervals must not overlap each other (true for active bookings of a
+    service), so for each candidate only the first interval ending after it can
+    collide. Candidates and intervals both move forward: O(slots + intervals).
+    """
+    midnight = window_start.replace(hour=0, minute=0, second=0, microsecond=0)
+    slot_start = align_up(window_start, midnight, granularity)
+    slots = []
+    index = 0
+    
+    while slot_start + duration <= window_end:
+        slot_end = slot_start + duration
+        
+        # Skip intervals that finished before this candidate starts
+        while index < len(busy) and busy[index][1] <= slot_start:
+            index += 1
+        
+        if index == len(busy) or busy[index][0] >= slot_end:
+            slots.append((slot_start, slot_end))
+            slot_start += granularity
+        else:
+            # Jump to the first grid point at or after the blocking interval's end
+            slot_start = align_up(busy[index][1], midnight, granularity)
+    
+    return slots
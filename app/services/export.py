@@ -0,0 +1,38 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, AsyncIterator, Sequence
+import csv
+import io
+import json
+
+
+def _plain(value: Any) -> Any:
+    """Render a column value the way the JSON API does"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+async def ndjson_chunks(columns: Sequence[str], batches: AsyncIterator[Sequence[Any]]) -> AsyncIterator[str]:
+    """One JSON object per row and line, one chunk per batch"""
+    async for batch in batches:
+        yield "".join(
+            json.dumps({column: _plain(value) for column, value in zip(columns, row)}) + "\n"
+            for row in batch
+        )
+
+
+async def csv_chunks(columns: Sequence[str], batches: AsyncIterator[Sequence[Any]]) -> AsyncIterator[str]:
+    """A header line, then CSV rows, one chunk per batch"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    yield buffer.getvalue()
+    
+    async for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows([_plain(value) for value in row] for row in batch)
+        yield buffer.getvalue()
@@ -0,0 +1,50 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+
+FREQUENCY_STEPS = {
+    "daily": timedelta(days=1),
+    "weekly": timedelta(weeks=1),
+}
+
+
+def series_step(frequency: str, interval: int) -> timedelta:
+    """Time between consecutive occurrences"""
+    return FREQUENCY_STEPS[frequency] * interval
+
+
+def last_occurrence_start(
+    first_start: datetime,
+    step: timedelta,
+    count: Optional[int],
+    until: Optional[datetime]
+) -> Optional[datetime]:
+    """Start of the series' final occurrence, or None when it never ends"""
+    if count is None and until is None:
+        return None
+    last = count - 1 if count is not None else None
+    if until is not None:
+        last = (until - first_start) // step if last is None else min(last, (until - first_start) // step)
+    return first_start + last * step
+
+
+def occurrence_starts(
+    first_start: datetime,
+    step: timedelta,
+    count: Optional[int],
+    until: Optional[datetime],
+    window_start: datetime,
+    window_end: datetime
+) -> List[datetime]:
+    """Starts of the occurrences first_start + k * step inside [window_start, window_end)
+    
+    Like RRULE, the series ends after `count` occurrences or at `until`
+    (inclusive). The range of k is computed directly, so expanding a window
+    costs only the occurrences inside it, however far into the series it is.
+    """
+    first = max(-(-(window_start - first_start) // step), 0)
+    last = -(-(window_end - first_start) // step)
+    if count is not None:
+        last = min(last, count)
+    if until is not None:
+        last = min(last, (until - first_start) // step + 1)
+    return [first_start + k * step for k in range(first, last)]
@@ -0,0 +1,130 @@
+from pydantic import TypeAdapter, ValidationError
+from typing import Any, Dict, Iterator, List, Optional, TextIO, Tuple
+import csv
+import json
+import re
+
+from app.schemas.schemas import ServiceCreate
+
+IMPORT_BATCH_SIZE = 1000
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = re.compile(r"\s*")
+
+_batch_adapter = TypeAdapter(List[ServiceCreate])
+
+
+class ImportFileError(ValueError):
+    """The upload cannot be parsed at all, as opposed to an invalid row"""
+
+
+def csv_records(text: TextIO) -> Iterator[Tuple[int, Any]]:
+    """(line, row) pairs; empty cells are left out so field defaults apply"""
+    reader = csv.DictReader(text)
+    if not reader.fieldnames:
+        raise ImportFileError("CSV file has no header row")
+    
+    for row in reader:
+        yield reader.line_num, {
+            key.strip(): value for key, value in row.items()
+            if key is not None and value not in (None, "")
+        }
+
+
+def ndjson_records(text: TextIO) -> Iterator[Tuple[int, Any]]:
+    """(line, value) pairs of a file with one JSON object per line"""
+    for line_number, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError:
+            raise ImportFileError(f"Line {line_number} is not valid JSON")
+
+
+def json_records(text: TextIO) -> Iterator[Tuple[int, Any]]:
+    """(position, value) pairs of a top-level JSON array, decoded chunk by chunk"""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    started = False
+    expect_comma = False
+    
+    while True:
+        chunk = text.read(CHUNK_SIZE)
+        buffer += chunk
+        offset = 0
+        
+        while True:
+            offset = WHITESPACE.match(buffer, offset).end()
+            if offset == len(buffer):
+                break
+            if not started:
+                if buffer[offset] != "[":
+                    raise ImportFileError("JSON file must contain an array of services")
+                started = True
+                offset += 1
+            elif buffer[offset] == "]" and (expect_comma or not position):
+                return
+            elif expect_comma:
+                if buffer[offset] != ",":
+                    raise ImportFileError(f"Expected ',' after item {position}")
+                expect_comma = False
+                offset += 1
+            else:
+                try:
+                    value, offset = decoder.raw_decode(buffer, offset)
+                except json.JSONDecodeError:
+                    # The item may continue in the next chunk
+                    break
+                position += 1
+                expect_comma = True
+                yield position, value
+        
+        buffer = buffer[offset:]
+        if not chunk:
+            raise ImportFileError(f"JSON array is malformed after item {position}")
+
+
+def validate_batches(
+    records: Iterator[Tuple[int, Any]],
+    batch_size: Optional[int] = None
+) -> Iterator[Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]:
+    """Validate records against ServiceCreate a batch at a time
+    
+    Yields (rows, errors) per batch: column values of the valid records and
+    {"row", "field", "message"} entries for the invalid ones.
+    """
+    batch_size = batch_size or IMPORT_BATCH_SIZE
+    batch: List[Tuple[int, Any]] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == batch_size:
+            yield _validate(batch)
+            batch = []
+    if batch:
+        yield _validate(batch)
+
+
+def _validate(batch: List[Tuple[int, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    values = [value for _, value in batch]
+    try:
+        return [service.model_dump() for service in _batch_adapter.validate_python(values)], []
+    except ValidationError as exc:
+        failures = exc.errors()
+    
+    # Only a batch with invalid records pays for validating the rest one by one
+    errors = []
+    failed = set()
+    for failure in failures:
+        index, *field = failure["loc"]
+        failed.add(index)
+        errors.append({
+            "row": batch[index][0],
+            "field": ".".join(str(part) for part in field) or None,
+            "message": failure["msg"]
+        })
+    rows = [
+        ServiceCreate.model_validate(value).model_dump()
+        for index, value in enumerate(values) if index not in failed
+    ]
+    return rows, errors
@@ -0,0 +1,124 @@
+"""Benchmark BookingRepository.check_conflict as one service's bookings grow
+
+Seeds 30-minute bookings every hour for a single service into the database
+in DATABASE_URL, then at each size prints the query plan of the conflict
+check and its latency for overlapping (hit) and free (miss) slots. Latency
+should stay flat from thousands to millions of rows.
+
+Point DATABASE_URL at a throwaway database: tables are created and
+bookings are appended to it.
+
+    python benchmarks/check_conflict.py --sizes 10000,100000,1000000
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+
+from sqlalchemy import event, func, insert, select
+
+from app.core.database import Base, async_engine, AsyncSessionLocal
+from app.models.models import Booking, BookingStatus, Service, User
+from app.repositories.booking_repository import BookingRepository
+
+BASE_TIME = datetime(2020, 1, 1)
+SEED_BATCH = 10000
+
+
+async def seed(size: int) -> int:
+    """Top up bookings for service 1 to `size` rows, returning the service ID"""
+    async with async_engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        service_id = await conn.scalar(select(Service.id).order_by(Service.id).limit(1))
+        if service_id is None:
+            user_id = (await conn.execute(
+                insert(User).values(name="Bench", email="bench@example.com", password_hash="-")
+            )).inserted_primary_key[0]
+            service_id = (await conn.execute(
+                insert(Service).values(title="Bench", description="Bench", price=0, duration_minutes=30)
+            )).inserted_primary_key[0]
+        else:
+            user_id = await conn.scalar(select(User.id).order_by(User.id).limit(1))
+        
+        existing = await conn.scalar(
+            select(func.count()).select_from(Booking).where(Booking.service_id == service_id)
+        )
+        for offset in range(existing, size, SEED_BATCH):
+            rows = [
+                {
+                    "user_id": user_id,
+                    "service_id": service_id,
+                    "start_time": BASE_TIME + timedelta(hours=i),
+                    "end_time": BASE_TIME + timedelta(hours=i, minutes=30),
+                    "status": BookingStatus.CONFIRMED,
+                }
+                for i in range(offset, min(offset + SEED_BATCH, size))
+            ]
+            await conn.execute(insert(Booking), rows)
+        await conn.exec_driver_sql("ANALYZE")
+    return service_id
+
+
+async def explain(repo: BookingRepository, service_id: int, start_time: datetime) -> str:
+    """Run the conflict check once and return the database's plan for it"""
+    captured = []
+    
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+    
+    event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+    try:
+        await repo.check_conflict(service_id, start_time, start_time + timedelta(minutes=30))
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+    
+    statement, parameters = captured[-1]
+    prefix = "EXPLAIN QUERY PLAN " if async_engine.dialect.name == "sqlite" else "EXPLAIN ANALYZE "
+    conn = await repo.db.connection()
+    result = await conn.exec_driver_sql(prefix + statement, parameters)
+    return "\n".join("    " + " ".join(str(col) for col in row) for row in result.all())
+
+
+async def measure(service_id: int, size: int, iterations: int) -> None:
+    async with AsyncSessionLocal() as db:
+        repo = BookingRepository(db)
+        print(f"\n== {size:,} bookings ==")
+        print(await explain(repo, service_id, BASE_TIME + timedelta(hours=size // 2, minutes=40)))
+        
+        timings = {"hit": [], "miss": []}
+        for _ in range(iterations):
+            hour = random.randrange(size)
+            for kind, minutes in (("hit", 10), ("miss", 35)):
+                start_time = BASE_TIME + timedelta(hours=hour, minutes=minutes)
+                started = time.perf_counter()
+                conflict = await repo.check_conflict(service_id, start_time, start_time + timedelta(minutes=20))
+                timings[kind].append((time.perf_counter() - started) * 1000)
+                assert conflict == (kind == "hit")
+        
+        for kind, values in timings.items():
+            values.sort()
+            p95 = values[int(len(values) * 0.95) - 1]
+            print(f"  {kind:<4} p50 {statistics.median(values):7.3f} ms   p95 {p95:7.3f} ms")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="Comma separated booking counts")
+    parser.add_argument("--iterations", type=int, default=200, help="Checks per size and kind")
+    args = parser.parse_args()
+    
+    print(f"Database: {async_engine.dialect.name}")
+    for size in sorted(int(value) for value in args.sizes.split(",")):
+        service_id = await seed(size)
+        await measure(service_id, size, args.iterations)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+"""Measure the import time of the application module against a budget
+
+Runs `python -X importtime -c "import main"` in fresh interpreters, as each
+uvicorn worker does on boot, and prints the best cumulative time with the
+slowest top-level imports. Fails (exit status 1) when the best run exceeds
+--budget-ms or when a module that must load lazily was imported.
+
+    python benchmarks/import_time.py --runs 5 --budget-ms 2000
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.realpath(os.path.join(os.path.dirname(__file__), '..'))
+
+IMPORT_BUDGET_MS = 2000
+# Loaded on first password hash or token, never while importing the app
+LAZY_MODULES = ("passlib", "jose", "cryptography")
+
+IMPORT_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def import_profile() -> list:
+    """(module, self_us, cumulative_us, depth) for one cold import of main"""
+    env = dict(os.environ)
+    env.setdefault("DATABASE_URL", "sqlite:///./bookit.db")
+    env.setdefault("SECRET_KEY", "import-time-benchmark")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        cwd=ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+    rows = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((module, int(self_us), int(cumulative_us), (len(indent) - 1) // 2))
+    return rows
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5, help="Cold imports to take the best of")
+    parser.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS, help="Allowed import time of main")
+    parser.add_argument("--top", type=int, default=10, help="Slowest top-level imports to show")
+    args = parser.parse_args()
+    
+    profiles = [import_profile() for _ in range(args.runs)]
+    best = min(profiles, key=lambda rows: rows[-1][2])
+    total_ms = best[-1][2] / 1000
+    
+    print(f"import main: best {total_ms:.0f} ms of {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+    # Rows list children before their parent; main's own imports follow the previous top-level row
+    start = max(index for index, row in enumerate(best[:-1]) if row[3] == 0) + 1
+    top_level = sorted((row for row in best[start:-1] if row[3] == 1), key=lambda row: -row[2])
+    for module, _, cumulative_us, _ in top_level[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+    
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import time {total_ms:.0f} ms exceeds the {args.budget_ms:.0f} ms budget")
+    eager = sorted({row[0] for row in best if row[0].split(".")[0] in LAZY_MODULES})
+    if eager:
+        failures.append(f"imported eagerly: {', '.join(eager)}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
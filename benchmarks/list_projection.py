@@ -0,0 +1,167 @@
+"""Time to build large GET /bookings and GET /services bodies, ORM entities vs column projections
+
+The list endpoints select only the columns of their response schema, read
+them as plain dicts on the session's Core connection and dump them to JSON
+without validating them again. This script builds the same page both ways
+on an in-memory SQLite database and prints, per page of --rows rows:
+
+- fetch: running the query and building entities (the page statements'
+  entity variants, as the repositories' removed get_all ran them) or dicts
+- serialize: turning the page into the response body, as the endpoint did
+  before (FastAPI's response_model validation, or the response cache's
+  validate-and-dump) and as it does now (dump_rows)
+
+Both bodies must decode to the same JSON; the script exits with status 1
+otherwise. No database setup is needed.
+
+    python benchmarks/list_projection.py --rows 10000
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bookit.db")
+os.environ.setdefault("SECRET_KEY", "list-projection-benchmark")
+
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.core.pagination import build_page
+from app.core.response_cache import dump_rows
+from app.models.models import Booking, BookingStatus, Service, User
+from app.repositories.booking_repository import BookingRepository, ServiceLoading, booking_page_statement
+from app.repositories.service_repository import ServiceRepository, service_page_statement
+from app.schemas.schemas import BookingResponse, Page, ServiceResponse
+
+BASE_TIME = datetime(2030, 1, 1)
+USERS = 20
+SERVICES_PER_BOOKING_PAGE = 50
+
+
+async def seed(engine, rows: int) -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.execute(insert(User), [
+            {"id": i, "name": f"User {i}", "email": f"user{i}@example.com", "password_hash": "-"}
+            for i in range(1, USERS + 1)
+        ])
+        await conn.execute(insert(Service), [
+            {"id": i, "title": f"Service {i}", "description": "A service to book", "price": i % 90 + 9.5,
+             "duration_minutes": 60, "rating_average": i % 5, "rating_count": i % 7, "rating_4_count": i % 7}
+            for i in range(1, rows + 1)
+        ])
+        await conn.execute(insert(Booking), [
+            {"user_id": i % USERS + 1, "service_id": i % SERVICES_PER_BOOKING_PAGE + 1,
+             "start_time": BASE_TIME + timedelta(hours=i), "end_time": BASE_TIME + timedelta(hours=i, minutes=30),
+             "status": BookingStatus.COMPLETED if i % 4 == 0 else BookingStatus.CONFIRMED}
+            for i in range(rows)
+        ])
+
+
+def booking_key(booking) -> tuple:
+    return (booking.start_time, booking.id)
+
+
+def service_key(service) -> tuple:
+    return (service.id,)
+
+
+def response_model_body(adapter: TypeAdapter, page: dict) -> bytes:
+    """What FastAPI's response_model handling produces: validate, dump, json.dumps"""
+    content = adapter.dump_python(adapter.validate_python(page, from_attributes=True), mode="json")
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+def cached_body(adapter: TypeAdapter, page: dict) -> bytes:
+    """What the response cache's store produces: validate, dump_json"""
+    return adapter.dump_json(adapter.validate_python(page, from_attributes=True))
+
+
+async def bookings_orm(db: AsyncSession, rows: int):
+    result = await db.execute(*booking_page_statement(limit=rows, service_loading=ServiceLoading.JOINED))
+    bookings = result.scalars().all()
+    return lambda: response_model_body(BOOKINGS_PAGE, build_page(bookings, rows, booking_key))
+
+
+async def bookings_projected(db: AsyncSession, rows: int):
+    bookings = await BookingRepository(db).get_all_rows(limit=rows)
+    return lambda: dump_rows(build_page(bookings, rows, lambda booking: (booking["start_time"], booking["id"])))
+
+
+async def services_orm(db: AsyncSession, rows: int):
+    result = await db.execute(*service_page_statement(limit=rows))
+    services = result.scalars().all()
+    return lambda: cached_body(SERVICES_PAGE, build_page(services, rows, service_key))
+
+
+async def services_projected(db: AsyncSession, rows: int):
+    services = await ServiceRepository(db).get_all_rows(limit=rows)
+    return lambda: dump_rows(build_page(services, rows, lambda service: (service["id"],)))
+
+
+BOOKINGS_PAGE = TypeAdapter(Page[BookingResponse])
+SERVICES_PAGE = TypeAdapter(Page[ServiceResponse])
+
+# (endpoint, before, after): each fetches a page and returns the function serializing it
+VARIANTS = [
+    ("GET /bookings", bookings_orm, bookings_projected),
+    ("GET /services", services_orm, services_projected),
+]
+
+
+async def timed(engine, variant, rows: int):
+    """(fetch seconds, serialize seconds, body) for one page, in a fresh session"""
+    async with AsyncSession(engine, expire_on_commit=False) as db:
+        started = time.perf_counter()
+        serialize = await variant(db, rows)
+        fetched = time.perf_counter()
+        body = serialize()
+        return fetched - started, time.perf_counter() - fetched, body
+
+
+async def run(rows: int, repeats: int) -> int:
+    engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+    await seed(engine, rows)
+    mismatches = []
+    
+    print(f"{rows} rows per page, best of {repeats}")
+    print(f"{'endpoint':<14} {'variant':<10} {'fetch':>9} {'serialize':>10} {'total':>9} {'rows/s':>10}")
+    for name, before, after in VARIANTS:
+        bodies = []
+        for label, variant in (("orm", before), ("projected", after)):
+            best = None
+            for _ in range(repeats):
+                fetch, serialize, body = await timed(engine, variant, rows)
+                if best is None or fetch + serialize < sum(best):
+                    best = (fetch, serialize)
+            bodies.append(body)
+            total = sum(best)
+            print(f"{name:<14} {label:<10} {best[0] * 1000:7.0f}ms {best[1] * 1000:8.0f}ms "
+                  f"{total * 1000:7.0f}ms {rows / total:10.0f}")
+        if json.loads(bodies[0]) != json.loads(bodies[1]):
+            mismatches.append(name)
+    
+    await engine.dispose()
+    for name in mismatches:
+        print(f"FAIL: {name}: projected and ORM responses differ")
+    return 1 if mismatches else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10000, help="Rows per page, and rows seeded per table")
+    parser.add_argument("--repeats", type=int, default=3, help="Pages to build per variant, taking the best")
+    args = parser.parse_args()
+    return asyncio.run(run(args.rows, args.repeats))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+"""Per-call Python overhead of the repositories' hot queries, cached vs built ad hoc
+
+The repositories build each shape of their hot queries once, with bindparam()
+placeholders, and pass only the values per call. This script pairs each of
+them with the same query built from scratch on every call, the way the
+repositories used to, and prints per call:
+
+- prepare: building the statement and its cache key, the Python work done
+  before the compiled SQL is found in the cache
+- execute: a full execute and fetch on an in-memory SQLite database, so the
+  driver adds as little as possible on top of SQLAlchemy
+
+Both variants run with different argument values on every call and must
+return the same rows; the script exits with status 1 otherwise. No database
+setup is needed.
+
+    python benchmarks/statement_cache.py --iterations 2000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
+os.environ.setdefault("DATABASE_URL", "sqlite:///./bookit.db")
+os.environ.setdefault("SECRET_KEY", "statement-cache-benchmark")
+
+from sqlalchemy import and_, create_engine, func, insert, or_, select, tuple_
+from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base
+from app.models.models import Booking, BookingStatus, Review, Service, User
+from app.repositories.booking_repository import (
+    ACTIVE_STATUSES, ServiceLoading, booking_page_statement, busy_intervals_statement, conflict_statement,
+    slot_bookings_statement
+)
+from app.repositories.review_repository import review_by_booking_statement, review_page_statement
+from app.repositories.service_repository import service_page_statement, services_by_ids_statement
+from app.repositories.user_repository import user_by_email_statement, user_by_id_statement
+from app.schemas.schemas import ServiceSort
+
+BASE_TIME = datetime(2030, 1, 1)
+USERS = 20
+SERVICES = 50
+BOOKINGS_PER_SERVICE = 20
+
+
+def seed(session: Session) -> None:
+    session.execute(insert(User), [
+        {"id": i, "name": f"User {i}", "email": f"user{i}@example.com", "password_hash": "-"}
+        for i in range(1, USERS + 1)
+    ])
+    session.execute(insert(Service), [
+        {"id": i, "title": f"Service {i}", "description": "-", "price": i, "duration_minutes": 60,
+         "rating_average": i % 5}
+        for i in range(1, SERVICES + 1)
+    ])
+    bookings = [
+        {"service_id": service_id, "user_id": slot % USERS + 1,
+         "start_time": BASE_TIME + timedelta(hours=2 * slot), "end_time": BASE_TIME + timedelta(hours=2 * slot + 1),
+         "status": BookingStatus.COMPLETED if slot % 4 == 0 else BookingStatus.CONFIRMED}
+        for service_id in range(1, SERVICES + 1) for slot in range(BOOKINGS_PER_SERVICE)
+    ]
+    session.execute(insert(Booking), bookings)
+    session.execute(insert(Review), [
+        {"booking_id": booking_id, "rating": booking_id % 5 + 1, "comment": "-"}
+        for booking_id in range(1, len(bookings) + 1, 4)
+    ])
+    session.commit()
+
+
+def window(i: int):
+    start = BASE_TIME + timedelta(hours=i % (2 * BOOKINGS_PER_SERVICE), minutes=30)
+    return start, start + timedelta(hours=1)
+
+
+def conflict_ad_hoc(i):
+    start, end = window(i)
+    latest = select(Booking.end_time).where(
+        Booking.service_id == i % SERVICES + 1,
+        Booking.status.in_(ACTIVE_STATUSES),
+        Booking.start_time < end
+    ).where(Booking.id != i)
+    latest_end = latest.order_by(Booking.start_time.desc()).limit(1).scalar_subquery()
+    return select(func.coalesce(latest_end > start, False))
+
+
+def busy_ad_hoc(i):
+    start, end = window(i)
+    straddling_start = select(func.max(Booking.start_time)).where(
+        Booking.service_id == i % SERVICES + 1,
+        Booking.status.in_(ACTIVE_STATUSES),
+        Booking.start_time < start
+    ).scalar_subquery()
+    return select(Booking.start_time, Booking.end_time, Booking.id).where(
+        Booking.service_id == i % SERVICES + 1,
+        Booking.status.in_(ACTIVE_STATUSES),
+        Booking.start_time >= func.coalesce(straddling_start, start),
+        Booking.end_time > start
+    ).where(Booking.start_time < end + timedelta(days=1)).order_by(Booking.start_time)
+
+
+def slots_ad_hoc(i):
+    start, end = window(i)
+    return select(Booking.service_id, Booking.start_time, Booking.end_time, Booking.id).where(
+        Booking.service_id.in_({i % SERVICES + 1, (i + 1) % SERVICES + 1}),
+        Booking.status.in_(ACTIVE_STATUSES),
+        Booking.start_time < end,
+        Booking.end_time > start
+    )
+
+
+def booking_page_ad_hoc(i):
+    query = select(Booking).options(joinedload(Booking.service))
+    query = query.where(Booking.user_id == i % USERS + 1).where(Booking.status == BookingStatus.CONFIRMED)
+    query = query.where(tuple_(Booking.start_time, Booking.id) < tuple_(window(i)[1], 10 ** 6))
+    return query.order_by(Booking.start_time.desc(), Booking.id.desc()).limit(21)
+
+
+def service_page_ad_hoc(i):
+    after_rating, after_id = i % 5, i % SERVICES
+    query = select(Service).where(Service.price >= i % 10).where(Service.is_active == True)  # noqa: E712
+    query = query.where(or_(
+        Service.rating_average < after_rating,
+        and_(Service.rating_average == after_rating, Service.id > after_id)
+    ))
+    return query.order_by(Service.rating_average.desc(), Service.id).limit(21)
+
+
+def review_page_ad_hoc(i):
+    query = select(Review).join(Review.booking).where(Booking.service_id == i % SERVICES + 1)
+    return query.where(Review.id > i % 10).order_by(Review.id).limit(21)
+
+
+# (name, ad hoc statement for call i, cached statement and parameters for call i)
+QUERIES = [
+    (
+        "users by id",
+        lambda i: select(User).where(User.id == i % USERS + 1),
+        lambda i: user_by_id_statement(i % USERS + 1),
+    ),
+    (
+        "users by email",
+        lambda i: select(User).where(User.email == f"user{i % USERS + 1}@example.com"),
+        lambda i: user_by_email_statement(f"user{i % USERS + 1}@example.com"),
+    ),
+    (
+        "services by ids",
+        lambda i: select(Service).where(Service.id.in_({i % SERVICES + 1, (i + 7) % SERVICES + 1})),
+        lambda i: services_by_ids_statement([i % SERVICES + 1, (i + 7) % SERVICES + 1]),
+    ),
+    (
+        "services page",
+        service_page_ad_hoc,
+        lambda i: service_page_statement(
+            price_min=i % 10, active=True, sort=ServiceSort.RATING, limit=20, after=(i % 5, i % SERVICES)
+        ),
+    ),
+    (
+        "bookings page",
+        booking_page_ad_hoc,
+        lambda i: booking_page_statement(
+            user_id=i % USERS + 1, status=BookingStatus.CONFIRMED, limit=20,
+            after=(window(i)[1], 10 ** 6), service_loading=ServiceLoading.JOINED
+        ),
+    ),
+    (
+        "booking conflict",
+        conflict_ad_hoc,
+        lambda i: conflict_statement(i % SERVICES + 1, *window(i), exclude_booking_id=i, disjoint=True),
+    ),
+    (
+        "busy intervals",
+        busy_ad_hoc,
+        lambda i: busy_intervals_statement(
+            i % SERVICES + 1, window(i)[0], window(i)[1] + timedelta(days=1), disjoint=True
+        ),
+    ),
+    (
+        "slot bookings",
+        slots_ad_hoc,
+        lambda i: slot_bookings_statement({i % SERVICES + 1, (i + 1) % SERVICES + 1}, *window(i)),
+    ),
+    (
+        "review by booking",
+        lambda i: select(Review).where(Review.booking_id == i % 100 + 1),
+        lambda i: review_by_booking_statement(i % 100 + 1),
+    ),
+    (
+        "reviews page",
+        review_page_ad_hoc,
+        lambda i: review_page_statement(i % SERVICES + 1, limit=20, after_id=i % 10),
+    ),
+]
+
+
+def per_call_us(function, iterations: int, repeats: int = 3) -> float:
+    """Best mean time of `function(i)` over `repeats` rounds, in microseconds"""
+    best = float("inf")
+    for _ in range(repeats):
+        started = time.perf_counter()
+        for i in range(iterations):
+            function(i)
+        best = min(best, (time.perf_counter() - started) / iterations)
+    return best * 1e6
+
+
+def rows(session: Session, statement, params=None) -> list:
+    return [tuple(row) for row in session.execute(statement, params).unique().all()]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per query and variant")
+    args = parser.parse_args()
+    
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    mismatches = []
+    totals = [0.0, 0.0, 0.0, 0.0]
+    
+    print(f"{'query':<18} {'prepare ad hoc':>15} {'cached':>8} {'execute ad hoc':>15} {'cached':>8}   (us per call)")
+    with Session(engine) as session:
+        seed(session)
+        for name, ad_hoc, cached in QUERIES:
+            for i in range(20):
+                if rows(session, ad_hoc(i)) != rows(session, *cached(i)):
+                    mismatches.append(name)
+                    break
+            
+            timings = [
+                per_call_us(lambda i: ad_hoc(i)._generate_cache_key(), args.iterations),
+                per_call_us(lambda i: cached(i)[0]._generate_cache_key(), args.iterations),
+                per_call_us(lambda i: session.execute(ad_hoc(i)).all(), args.iterations),
+                per_call_us(lambda i: session.execute(*cached(i)).all(), args.iterations),
+            ]
+            totals = [total + timing for total, timing in zip(totals, timings)]
+            print(f"{name:<18} {timings[0]:15.1f} {timings[1]:8.1f} {timings[2]:15.1f} {timings[3]:8.1f}")
+    
+    print(f"{'total':<18} {totals[0]:15.1f} {totals[1]:8.1f} {totals[2]:15.1f} {totals[3]:8.1f}")
+    print(f"prepare {1 - totals[1] / totals[0]:.0%} faster, execute {1 - totals[3] / totals[2]:.0%} faster")
+    for name in mismatches:
+        print(f"FAIL: {name}: cached and ad hoc statements returned different rows")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,20 @@
-from fastapi import FastAPI
+import time
+
+# Startup timings include importing the application
+IMPORT_STARTED = time.perf_counter()
+
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
 
+from app.core.cache import user_cache
 from app.core.config import settings
-from app.core.database import engine, Base
-from app.api.v1 import auth, users, services, bookings, reviews
+from app.core.database import async_engine, pool_stats
+from app.core.dependencies import require_admin
+from app.core.security import password_hasher, token_cache
+from app.core.startup import StartupTimer, prepare_schema, schema_mode
+from app.api.v1 import auth, users, services, bookings, reviews, series
 
 # Configure logging
 logging.basicConfig(
@@ -19,10 +28,19 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
     logger.info("Starting up BookIt API...")
-    # Create tables (in production, use Alembic migrations)
-    Base.metadata.create_all(bind=engine)
+    timer = StartupTimer(started=IMPORT_STARTED)
+    timer.mark("imports")
+    
+    # Production schemas come from `alembic upgrade head`, run once before the workers start
+    mode = schema_mode()
+    with timer.phase(f"schema {mode}"):
+        await prepare_schema(async_engine, mode)
+    
+    app.state.startup_phases = timer.phases
+    logger.info("BookIt API started in %s", timer)
     yield
     logger.info("Shutting down BookIt API...")
+    password_hasher.shutdown()
 
 
 app = FastAPI(
@@ -49,6 +67,7 @@ app.include_router(users.router, prefix="", tags=["Users"])
 app.include_router(services.router, prefix="/services", tags=["Services"])
 app.include_router(bookings.router, prefix="/bookings", tags=["Bookings"])
 app.include_router(reviews.router, prefix="/reviews", tags=["Reviews"])
+app.include_router(series.router, prefix="/booking-series", tags=["Booking Series"])
 
 
 @app.get("/")
@@ -64,4 +83,16 @@ async def root():
 @app.get("/health")
 async def health_check():
     """Health check for monitoring"""
-    return {"status": "healthy"}
\ No newline at end of file
+    return {"status": "healthy"}
+
+
+@app.get("/health/pool")
+async def database_pool(admin = Depends(require_admin)):
+    """Connection pool statistics of the worker serving the request (admin only)"""
+    return pool_stats()
+
+
+@app.get("/health/caches")
+async def cache_stats(admin = Depends(require_admin)):
+    """Hit rates of the serving worker's verified-token and user caches (admin only)"""
+    return {"tokens": token_cache.stats(), "users": user_cache.stats()}
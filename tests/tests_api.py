@@ -1,29 +1,56 @@
+import asyncio
+import json
+import os
 import pytest
+import shutil
+import subprocess
+import sys
+from contextlib import contextmanager
+from fastapi import Request
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from jose.exceptions import ExpiredSignatureError
+from sqlalchemy import create_engine, event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
-from datetime import datetime, timedelta
+from sqlalchemy.pool import NullPool
+from datetime import datetime, timedelta, timezone
 
 from main import app
-from app.core.database import Base, get_db
-from app.core.security import hash_password
-from app.models.models import User, Service, UserRole
+from app.core.database import (
+    Base, MeteredNullPool, MeteredQueuePool, engine_options, get_async_db, get_async_database_url
+)
+from app.core.cache import TTLCache, user_cache
+from app.core.replicas import ReplicaSet, build_replica_set
+from app.repositories.booking_repository import booking_page_statement, conflict_statement
+from app.core.response_cache import RedisBackend, response_cache
+from app.core import security
+from app.core.security import hash_password, password_hasher, create_access_token, decode_token, token_cache
+from app.models.models import User, Service, Booking, UserRole
+from app.core.config import settings
+from app.core.startup import SchemaVersionError, expected_heads, verify_schema
+from app.services.availability import free_slots
+from app.services.recurrence import occurrence_starts
+from app.schemas.schemas import BookingResponse, ServiceResponse
 
 # Test database
 SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
 engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# TestClient runs each request on a fresh event loop, so async connections are not pooled
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+TestingAsyncSessionLocal = async_sessionmaker(
+    bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+)
 
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
+
+async def override_get_async_db(request: Request):
+    async with TestingAsyncSessionLocal() as db:
+        request.state.db = db
         yield db
-    finally:
-        db.close()
 
 
-app.dependency_overrides[get_db] = override_get_db
+app.dependency_overrides[get_async_db] = override_get_async_db
 client = TestClient(app)
 
 
@@ -33,6 +60,8 @@ def setup_database():
     Base.metadata.create_all(bind=engine)
     yield
     Base.metadata.drop_all(bind=engine)
+    user_cache.clear()
+    asyncio.run(response_cache.clear())
 
 
 @pytest.fixture
@@ -87,6 +116,36 @@ def test_service(setup_database):
     return service
 
 
+@contextmanager
+def count_queries():
+    """Count SQL statements the API executes inside the block"""
+    statements = []
+    
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", before_cursor_execute)
+
+
+def create_bookings(user_id: int, service_id: int, count: int):
+    """Insert bookings directly, one hour apart starting tomorrow"""
+    db = TestingSessionLocal()
+    base_time = datetime.utcnow() + timedelta(days=1)
+    for i in range(count):
+        db.add(Booking(
+            user_id=user_id,
+            service_id=service_id,
+            start_time=base_time + timedelta(hours=i),
+            end_time=base_time + timedelta(hours=i, minutes=60)
+        ))
+    db.commit()
+    db.close()
+
+
 def get_token(email: str, password: str):
     """Helper to get JWT token"""
     response = client.post(
@@ -96,6 +155,15 @@ def get_token(email: str, password: str):
     return response.json()["access_token"]
 
 
+# ===== DATABASE TESTS =====
+
+def test_async_database_url():
+    """Test sync database URLs map onto their async drivers"""
+    assert get_async_database_url("postgresql://u:p@db:5432/bookit") == "postgresql+asyncpg://u:p@db:5432/bookit"
+    assert get_async_database_url("postgresql+psycopg2://u:p@db/bookit") == "postgresql+asyncpg://u:p@db/bookit"
+    assert get_async_database_url("sqlite:///./test.db") == "sqlite+aiosqlite:///./test.db"
+
+
 # ===== AUTH TESTS =====
 
 def test_register_user(setup_database):
@@ -160,6 +228,17 @@ def test_login_nonexistent_user(setup_database):
     assert response.status_code == 401
 
 
+def test_login_hasher_saturated(test_user, monkeypatch):
+    """Test login sheds load with 503 when the hashing pool is full"""
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    response = client.post(
+        "/auth/login",
+        json={"email": "test@example.com", "password": "password123"}
+    )
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+
 def test_refresh_token(test_user):
     """Test token refresh"""
     login_response = client.post(
@@ -178,6 +257,46 @@ def test_refresh_token(test_user):
     assert "refresh_token" in data
 
 
+def test_decode_token_cache_hit():
+    """Test a token is only signature-checked once"""
+    token_cache.clear()
+    token = create_access_token(data={"sub": "1"})
+    first = decode_token(token)
+    second = decode_token(token)
+    assert first == second
+    assert token_cache.stats()["hits"] == 1
+
+
+def test_import_main_loads_crypto_lazily():
+    """Test a cold `import main` imports no crypto module, and meets IMPORT_TIME_BUDGET_MS when set"""
+    # Wall-clock budgets flake on shared CI runners, so the timing check is opt-in
+    budget_ms = os.environ.get("IMPORT_TIME_BUDGET_MS")
+    result = subprocess.run(
+        [
+            sys.executable, os.path.join(os.path.dirname(__file__), "..", "benchmarks", "import_time.py"),
+            "--runs", "3" if budget_ms else "1", "--budget-ms", budget_ms or "inf"
+        ],
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stdout
+
+
+def test_decode_token_cache_honors_exp(monkeypatch):
+    """Test cached claims are not returned once the token has expired"""
+    token = create_access_token(data={"sub": "1"}, expires_delta=timedelta(seconds=30))
+    payload = decode_token(token)
+    assert payload is not None
+    
+    def expired_decode(*args, **kwargs):
+        raise ExpiredSignatureError("Signature has expired.")
+    
+    # Past exp the cached claims must be ignored and the token re-verified
+    monkeypatch.setattr(security.time, "time", lambda: payload["exp"] + 1)
+    monkeypatch.setattr("jose.jwt.decode", expired_decode)
+    assert decode_token(token) is None
+
+
 def test_protected_route_without_token(setup_database):
     """Test accessing protected route without token"""
     response = client.get("/me")
@@ -219,6 +338,47 @@ def test_update_current_user(test_user):
     assert response.json()["name"] == "Updated Name"
 
 
+def test_current_user_is_cached(test_user):
+    """Test repeated authenticated requests skip the user lookup"""
+    token = get_token("test@example.com", "password123")
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/me", headers=headers)
+    
+    with count_queries() as statements:
+        response = client.get("/me", headers=headers)
+    assert response.status_code == 200
+    assert statements == []
+    assert user_cache.stats()["hits"] >= 1
+
+
+def test_update_current_user_invalidates_cache(test_user):
+    """Test profile updates are visible on the next request"""
+    token = get_token("test@example.com", "password123")
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/me", headers=headers)
+    client.patch("/me", headers=headers, json={"name": "Renamed User"})
+    
+    response = client.get("/me", headers=headers)
+    assert response.json()["name"] == "Renamed User"
+
+
+def test_ttl_cache_expiry_and_eviction():
+    """Test TTLCache expires entries and evicts the least recently used"""
+    now = [0.0]
+    cache = TTLCache(max_size=2, ttl_seconds=10, clock=lambda: now[0])
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    
+    now[0] = 11.0
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 2
+    assert cache.stats()["misses"] == 2
+
+
 # ===== SERVICE TESTS =====
 
 def test_get_services(test_service):
@@ -226,8 +386,143 @@ def test_get_services(test_service):
     response = client.get("/services")
     assert response.status_code == 200
     data = response.json()
-    assert len(data) > 0
-    assert data[0]["title"] == "Test Service"
+    assert len(data["items"]) > 0
+    assert data["items"][0]["title"] == "Test Service"
+    assert data["next_cursor"] is None
+
+
+def test_get_services_paginated(setup_database):
+    """Test walking the services listing with keyset cursors"""
+    db = TestingSessionLocal()
+    for i in range(5):
+        db.add(Service(
+            title=f"Service {i}",
+            description="Paginated service",
+            price=10.0 * i,
+            duration_minutes=30
+        ))
+    db.commit()
+    db.close()
+    
+    titles = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        response = client.get("/services", params=params)
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data["items"]) <= 2
+        titles.extend(item["title"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    
+    assert titles == [f"Service {i}" for i in range(5)]
+
+
+def test_get_services_invalid_cursor(setup_database):
+    """Test malformed cursors are rejected"""
+    response = client.get("/services", params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
+
+
+def test_search_services_ranked(setup_database):
+    """Test full-text search matches word prefixes and ranks title hits first"""
+    db = TestingSessionLocal()
+    db.add_all([
+        Service(title="Hot stone therapy", description="Relaxing massages", price=80.0, duration_minutes=60),
+        Service(title="Deep tissue massage", description="Sports recovery", price=90.0, duration_minutes=60),
+        Service(title="Haircut", description="Classic cut", price=20.0, duration_minutes=30),
+        Service(title="Massage for two", description="Couples massage", price=150.0, duration_minutes=90),
+    ])
+    db.commit()
+    db.close()
+    
+    titles = []
+    cursor = None
+    while True:
+        params = {"q": "massa", "limit": 1}
+        if cursor:
+            params["cursor"] = cursor
+        data = client.get("/services", params=params).json()
+        titles.extend(item["title"] for item in data["items"])
+        cursor = data["next_cursor"]
+        if cursor is None:
+            break
+    
+    assert len(titles) == 3
+    assert titles[-1] == "Hot stone therapy"
+    
+    # Edits are reflected immediately and search syntax in q is treated as text
+    admin_db = TestingSessionLocal()
+    haircut = admin_db.query(Service).filter(Service.title == "Haircut").one()
+    haircut.description = "Scalp massage included"
+    admin_db.commit()
+    admin_db.close()
+    response = client.get("/services", params={"q": 'scalp" *'})
+    assert response.status_code == 200
+    assert [item["title"] for item in response.json()["items"]] == ["Haircut"]
+
+
+def test_services_response_cache(test_admin, test_service):
+    """Test cached catalog responses, ETag revalidation and invalidation on writes"""
+    first = client.get("/services")
+    etag = first.headers["etag"]
+    with count_queries() as statements:
+        second = client.get("/services")
+    assert second.content == first.content
+    assert statements == []
+    
+    response = client.get("/services", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    
+    token = get_token("admin@example.com", "admin123")
+    client.patch(
+        f"/services/{test_service.id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"title": "Renamed Service"}
+    )
+    response = client.get("/services", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["items"][0]["title"] == "Renamed Service"
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis.asyncio client calls RedisBackend makes"""
+    
+    def __init__(self):
+        self.values = {}
+    
+    async def get(self, key):
+        return self.values.get(key)
+    
+    async def set(self, key, value, ex=None):
+        self.values[key] = value
+    
+    async def incr(self, key):
+        self.values[key] = int(self.values.get(key, 0)) + 1
+        return self.values[key]
+
+
+def test_services_response_cache_shared_backend(test_service, monkeypatch):
+    """Test a shared backend serves entries and sees invalidations from any worker"""
+    fake = FakeRedis()
+    monkeypatch.setattr(response_cache, "backend", RedisBackend(fake))
+    
+    client.get(f"/services/{test_service.id}")
+    with count_queries() as statements:
+        client.get(f"/services/{test_service.id}")
+    assert statements == []
+    
+    # Another worker bumping the generation makes every stored entry unreachable
+    asyncio.run(RedisBackend(fake).bump("services"))
+    with count_queries() as statements:
+        client.get(f"/services/{test_service.id}")
+    assert len(statements) == 1
 
 
 def test_get_service_by_id(test_service):
@@ -237,6 +532,71 @@ def test_get_service_by_id(test_service):
     assert response.json()["title"] == "Test Service"
 
 
+def test_get_service_availability(test_user, test_service):
+    """Test free slots exclude the time taken by an active booking"""
+    token = get_token("test@example.com", "password123")
+    day = (datetime.utcnow() + timedelta(days=2)).replace(hour=0, minute=0, second=0, microsecond=0)
+    client.post(
+        "/bookings",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "service_id": test_service.id,
+            "start_time": (day + timedelta(hours=10)).isoformat()
+        }
+    )
+    
+    response = client.get(
+        f"/services/{test_service.id}/availability",
+        params={
+            "from": (day + timedelta(hours=9)).isoformat(),
+            "to": (day + timedelta(hours=12, minutes=30)).isoformat(),
+            "granularity": 30
+        }
+    )
+    assert response.status_code == 200
+    starts = [slot["start_time"] for slot in response.json()["slots"]]
+    assert starts == [
+        (day + timedelta(hours=9)).isoformat(),
+        (day + timedelta(hours=11)).isoformat(),
+        (day + timedelta(hours=11, minutes=30)).isoformat(),
+    ]
+    
+    # The same window with a UTC offset
+    offset = timezone(timedelta(hours=2))
+    response = client.get(
+        f"/services/{test_service.id}/availability",
+        params={
+            "from": (day + timedelta(hours=9)).replace(tzinfo=timezone.utc).astimezone(offset).isoformat(),
+            "to": (day + timedelta(hours=12, minutes=30)).replace(tzinfo=timezone.utc).isoformat(),
+            "granularity": 30
+        }
+    )
+    assert response.status_code == 200
+    assert [slot["start_time"] for slot in response.json()["slots"]] == starts
+
+
+def test_free_slots_with_straddling_interval():
+    """Test the sweep skips an interval that starts before the window"""
+    day = datetime(2030, 1, 1)
+    busy = [
+        (day + timedelta(hours=8, minutes=30), day + timedelta(hours=9, minutes=20)),
+        (day + timedelta(hours=10), day + timedelta(hours=11)),
+    ]
+    slots = free_slots(
+        busy,
+        day + timedelta(hours=9),
+        day + timedelta(hours=12),
+        duration=timedelta(minutes=30),
+        granularity=timedelta(minutes=15)
+    )
+    assert [start for start, _ in slots] == [
+        day + timedelta(hours=9, minutes=30),
+        day + timedelta(hours=11),
+        day + timedelta(hours=11, minutes=15),
+        day + timedelta(hours=11, minutes=30),
+    ]
+
+
 def test_get_nonexistent_service(setup_database):
     """Test getting non-existent service"""
     response = client.get("/services/9999")
@@ -279,6 +639,46 @@ def test_create_service_as_user_forbidden(test_user):
     assert response.status_code == 403
 
 
+def test_import_services_batches_and_reports_errors(test_admin, monkeypatch):
+    """Test importing services inserts valid rows in batches and reports the rest"""
+    monkeypatch.setattr("app.services.service_import.IMPORT_BATCH_SIZE", 2)
+    token = get_token("admin@example.com", "admin123")
+    headers = {"Authorization": f"Bearer {token}"}
+    lines = ["title,description,price,duration_minutes,is_active"]
+    lines += [f"Service {i},Imported,{10 + i},30," for i in range(4)]
+    lines.append("Broken,Imported,-5,thirty,true")
+    
+    with count_queries() as statements:
+        response = client.post(
+            "/services/import",
+            headers=headers,
+            files={"file": ("services.csv", "\n".join(lines), "text/csv")}
+        )
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] == 4
+    assert report["rejected"] == 1
+    assert {(error["row"], error["field"]) for error in report["errors"]} == {(6, "price"), (6, "duration_minutes")}
+    assert len([s for s in statements if s.startswith("INSERT INTO services")]) == 2
+    assert client.get("/services").json()["items"][0]["is_active"] is True
+    
+    items = [{"title": "Json", "description": "Imported", "price": 5, "duration_minutes": 15}]
+    response = client.post(
+        "/services/import",
+        headers=headers,
+        files={"file": ("services.json", json.dumps(items), "application/json")}
+    )
+    assert response.json()["imported"] == 1
+    
+    response = client.post(
+        "/services/import",
+        headers=headers,
+        files={"file": ("services.json", json.dumps(items)[:-1], "application/json")}
+    )
+    assert response.status_code == 400
+    assert len(client.get("/services").json()["items"]) == 5
+
+
 def test_update_service_as_admin(test_admin, test_service):
     """Test updating service as admin"""
     token = get_token("admin@example.com", "admin123")
@@ -366,6 +766,324 @@ def test_booking_conflict(test_user, test_service):
     assert "conflict" in response.json()["detail"].lower()
 
 
+def test_reactivating_booking_conflict(test_user, test_admin, test_service):
+    """Test admin cannot reactivate a cancelled booking over a newer one"""
+    user_token = get_token("test@example.com", "password123")
+    admin_token = get_token("admin@example.com", "admin123")
+    start_time = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    booking_json = {"service_id": test_service.id, "start_time": start_time}
+    
+    first_id = client.post(
+        "/bookings",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json=booking_json
+    ).json()["id"]
+    client.patch(
+        f"/bookings/{first_id}",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"status": "cancelled"}
+    )
+    response = client.post(
+        "/bookings",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json=booking_json
+    )
+    assert response.status_code == 201
+    
+    response = client.patch(
+        f"/bookings/{first_id}",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        json={"status": "confirmed"}
+    )
+    assert response.status_code == 409
+
+
+def test_booking_conflict_with_stored_overlaps(test_user, test_service):
+    """Test an overlap is found when stored active bookings already overlap each other"""
+    token = get_token("test@example.com", "password123")
+    day = (datetime.utcnow() + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
+    
+    # Without the Postgres exclusion constraint racing pre-checks can store both
+    db = TestingSessionLocal()
+    db.add_all([
+        Booking(user_id=test_user.id, service_id=test_service.id,
+                start_time=day.replace(hour=10), end_time=day.replace(hour=12)),
+        Booking(user_id=test_user.id, service_id=test_service.id,
+                start_time=day.replace(hour=10, minute=30), end_time=day.replace(hour=11))
+    ])
+    db.commit()
+    db.close()
+    
+    booking_json = {"service_id": test_service.id, "start_time": day.replace(hour=11, minute=30).isoformat()}
+    response = client.post("/bookings", headers={"Authorization": f"Bearer {token}"}, json=booking_json)
+    assert response.status_code == 409
+    
+    response = client.post("/bookings/bulk", headers={"Authorization": f"Bearer {token}"}, json={"items": [booking_json]})
+    assert [result["status_code"] for result in response.json()["results"]] == [409]
+
+
+def test_create_bookings_bulk(test_user, test_service):
+    """Test bulk booking reports conflicts with existing bookings and within the batch"""
+    token = get_token("test@example.com", "password123")
+    base_time = datetime.utcnow() + timedelta(days=1)
+    create_bookings(test_user.id, test_service.id, 1)
+    db = TestingSessionLocal()
+    db.add(Service(title="Retired", description="Inactive", price=1.0, duration_minutes=30, is_active=False))
+    db.commit()
+    inactive_id = db.query(Service).filter(Service.title == "Retired").one().id
+    db.close()
+    
+    starts = [base_time + timedelta(hours=hours) for hours in (0, 2, 2.5, 4)]
+    items = [{"service_id": test_service.id, "start_time": start.isoformat()} for start in starts]
+    items.append({"service_id": inactive_id, "start_time": starts[0].isoformat()})
+    items.append({"service_id": 9999, "start_time": starts[0].isoformat()})
+    
+    with count_queries() as statements:
+        response = client.post("/bookings/bulk", headers={"Authorization": f"Bearer {token}"}, json={"items": items})
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert [result["status_code"] for result in data["results"]] == [409, 201, 409, 201, 400, 404]
+    assert data["results"][1]["booking"]["service"]["id"] == test_service.id
+    assert sum(statement.startswith("INSERT INTO bookings") for statement in statements) == 1
+    
+    response = client.post(
+        "/bookings/bulk",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"items": items * 20}
+    )
+    assert response.status_code == 422
+
+
+def test_engine_options_follow_pool_settings(monkeypatch):
+    """Test pool sizing comes from settings and PgBouncer mode disables prepared statement reuse"""
+    url = "postgresql+asyncpg://user:secret@db/bookit"
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 2)
+    monkeypatch.setattr(settings, "DB_POOL_USE_LIFO", True)
+    options = engine_options(url, is_async=True)
+    assert options["poolclass"] is MeteredQueuePool
+    assert options["pool_size"] == 2
+    assert options["pool_use_lifo"] is True
+    
+    monkeypatch.setattr(settings, "DB_EXTERNAL_POOLER", True)
+    options = engine_options(url, is_async=True)
+    assert options["poolclass"] is MeteredNullPool
+    assert "pool_size" not in options
+    assert options["connect_args"]["statement_cache_size"] == 0
+    assert options["connect_args"]["prepared_statement_name_func"]() != options["connect_args"]["prepared_statement_name_func"]()
+
+
+def test_pool_stats_admin_only(test_user, test_admin):
+    """Test pool statistics are reported to admins only"""
+    response = client.get("/health/pool", headers={"Authorization": f"Bearer {get_token('admin@example.com', 'admin123')}"})
+    assert response.status_code == 200
+    assert {"pool", "checkouts", "timeouts", "wait_seconds_max"} <= set(response.json())
+    
+    response = client.get("/health/pool", headers={"Authorization": f"Bearer {get_token('test@example.com', 'password123')}"})
+    assert response.status_code == 403
+
+
+def test_cache_stats_report_token_and_user_hits(test_user, test_admin):
+    """Test token and user cache hit rates are reported to admins only"""
+    headers = {"Authorization": f"Bearer {get_token('admin@example.com', 'admin123')}"}
+    token_cache.clear()
+    client.get("/me", headers=headers)
+    response = client.get("/health/caches", headers=headers)
+    assert response.status_code == 200
+    stats = response.json()
+    assert stats["tokens"]["misses"] >= 1 and stats["tokens"]["hits"] >= 1
+    assert {"size", "max_size", "hits", "misses", "hit_rate"} <= set(stats["users"])
+    
+    response = client.get("/health/caches", headers={"Authorization": f"Bearer {get_token('test@example.com', 'password123')}"})
+    assert response.status_code == 403
+
+
+def test_reads_go_to_healthy_replica_except_after_own_write(test_user, test_admin, test_service, monkeypatch):
+    """Test read endpoints use a reachable replica, and a user who just wrote reads from the primary"""
+    broken = create_async_engine("sqlite+aiosqlite:///./missing/replica.db", poolclass=NullPool)
+    replica = create_async_engine("sqlite+aiosqlite:///./test.db", poolclass=NullPool)
+    now = [0.0]
+    replicas = ReplicaSet([broken, replica], retry_seconds=30, clock=lambda: now[0])
+    monkeypatch.setattr("app.core.replicas.replica_set", replicas)
+    user_headers = {"Authorization": f"Bearer {get_token('test@example.com', 'password123')}"}
+    admin_headers = {"Authorization": f"Bearer {get_token('admin@example.com', 'admin123')}"}
+    
+    replica_statements = []
+    replica_connects = []
+    
+    def on_execute(conn, cursor, statement, parameters, context, executemany):
+        replica_statements.append(statement)
+    
+    def on_connect(dbapi_connection, connection_record):
+        replica_connects.append(connection_record)
+    
+    event.listen(replica.sync_engine, "before_cursor_execute", on_execute)
+    event.listen(replica.sync_engine, "connect", on_connect)
+    try:
+        # The unreachable replica is skipped and left out until it may have recovered
+        assert client.get(f"/services/{test_service.id}").status_code == 200
+        assert replica_statements
+        assert replicas.candidates() == replicas.candidates() == [replica]
+        
+        # A response cache hit never connects to a replica
+        replica_connects.clear()
+        assert client.get(f"/services/{test_service.id}").status_code == 200
+        assert not replica_connects
+        
+        now[0] += 31
+        assert broken in replicas.candidates()
+        
+        response = client.post(
+            "/bookings",
+            headers=user_headers,
+            json={"service_id": test_service.id, "start_time": (datetime.utcnow() + timedelta(days=1)).isoformat()}
+        )
+        assert response.status_code == 201
+        
+        replica_statements.clear()
+        assert len(client.get("/bookings", headers=user_headers).json()["items"]) == 1
+        assert not replica_statements
+        
+        assert len(client.get("/bookings", headers=admin_headers).json()["items"]) == 1
+        assert replica_statements
+        
+        # With no replica answering, reads fall back to the primary
+        monkeypatch.setattr("app.core.replicas.replica_set", ReplicaSet([broken], retry_seconds=30))
+        assert len(client.get("/bookings", headers=admin_headers).json()["items"]) == 1
+    finally:
+        event.remove(replica.sync_engine, "before_cursor_execute", on_execute)
+        event.remove(replica.sync_engine, "connect", on_connect)
+
+
+def test_replicas_require_shared_sticky_window(monkeypatch):
+    """Test replicas are refused unless the sticky-primary window is shared through Redis"""
+    monkeypatch.setattr(settings, "REPLICA_DATABASE_URLS", ["sqlite:///./replica.db"])
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_BACKEND", "memory")
+    with pytest.raises(RuntimeError):
+        build_replica_set()
+    
+    monkeypatch.setattr(settings, "RESPONSE_CACHE_BACKEND", "redis")
+    assert len(build_replica_set().engines) == 1
+
+
+def test_writer_bypasses_response_cache_filled_from_lagging_replica(test_admin, test_service, monkeypatch, tmp_path):
+    """Test a user pinned to the primary never gets a cached body built on a stale replica"""
+    # A replica that has not replicated the update below yet
+    shutil.copy("./test.db", tmp_path / "replica.db")
+    lagging = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'replica.db'}", poolclass=NullPool)
+    monkeypatch.setattr("app.core.replicas.replica_set", ReplicaSet([lagging], retry_seconds=30))
+    headers = {"Authorization": f"Bearer {get_token('admin@example.com', 'admin123')}"}
+    
+    response = client.patch(f"/services/{test_service.id}", headers=headers, json={"title": "Renamed Service"})
+    assert response.status_code == 200
+    
+    # Other users read the replica, and cache what they read under the new generation
+    assert client.get(f"/services/{test_service.id}").json()["title"] == "Test Service"
+    assert client.get(f"/services/{test_service.id}", headers=headers).json()["title"] == "Renamed Service"
+    assert client.get("/services", headers=headers).json()["items"][0]["title"] == "Renamed Service"
+
+
+def test_verify_schema_requires_alembic_head(setup_database):
+    """Test the production boot path accepts only a database at the migration head"""
+    with pytest.raises(SchemaVersionError):
+        asyncio.run(verify_schema(async_engine))
+    
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE alembic_version (version_num VARCHAR(32) NOT NULL)")
+        conn.exec_driver_sql("INSERT INTO alembic_version VALUES ('a0425ae16c91')")
+    with pytest.raises(SchemaVersionError, match="a0425ae16c91"):
+        asyncio.run(verify_schema(async_engine))
+    
+    with engine.begin() as conn:
+        conn.exec_driver_sql("UPDATE alembic_version SET version_num = ?", (next(iter(expected_heads())),))
+    asyncio.run(verify_schema(async_engine))
+    
+    with engine.begin() as conn:
+        conn.exec_driver_sql("DROP TABLE alembic_version")
+
+
+def test_startup_reports_phase_timings(monkeypatch):
+    """Test startup without DDL still records how long each phase took"""
+    monkeypatch.setattr(settings, "SCHEMA_STARTUP_MODE", "skip")
+    with TestClient(app):
+        phases = dict(app.state.startup_phases)
+    assert set(phases) == {"imports", "schema skip"}
+    
+    monkeypatch.setattr(settings, "SCHEMA_STARTUP_MODE", None)
+    monkeypatch.setattr(settings, "ENVIRONMENT", "production")
+    with pytest.raises(SchemaVersionError):
+        with TestClient(app):
+            pass
+
+
+def test_occurrence_starts_window():
+    """Test recurrence expansion jumps straight to the requested window"""
+    first = datetime(2030, 1, 7, 9)
+    week = timedelta(weeks=1)
+    assert len(occurrence_starts(first, week, 104, None, first, datetime.max)) == 104
+    
+    window = occurrence_starts(first, week, 104, None, first + 50 * week - timedelta(hours=1), first + 52 * week)
+    assert window == [first + 50 * week, first + 51 * week]
+    assert occurrence_starts(first, week, None, first + 2 * week, first, datetime.max)[-1] == first + 2 * week
+
+
+def test_booking_series_materializes_lazily(test_user, test_admin, test_service, monkeypatch):
+    """Test a two-year weekly series books only the horizon and rolls forward"""
+    token = get_token("test@example.com", "password123")
+    headers = {"Authorization": f"Bearer {token}"}
+    start_time = (datetime.utcnow() + timedelta(days=1)).replace(microsecond=0)
+    series_json = {
+        "service_id": test_service.id,
+        "start_time": start_time.isoformat(),
+        "frequency": "weekly",
+        "count": 104
+    }
+    
+    # One occurrence a year out is taken: the whole series is refused
+    taken = client.post(
+        "/bookings",
+        headers=headers,
+        json={"service_id": test_service.id, "start_time": (start_time + timedelta(weeks=52)).isoformat()}
+    )
+    response = client.post("/booking-series", headers=headers, json=series_json)
+    assert response.status_code == 409
+    assert (start_time + timedelta(weeks=52)).isoformat() in response.json()["detail"]
+    
+    client.delete(f"/bookings/{taken.json()['id']}", headers=headers)
+    response = client.post("/booking-series", headers=headers, json=series_json)
+    assert response.status_code == 201
+    series_id = response.json()["id"]
+    
+    def series_bookings():
+        db = TestingSessionLocal()
+        bookings = db.query(Booking).filter(Booking.series_id == series_id).all()
+        db.close()
+        return bookings
+    
+    assert len(series_bookings()) == 4
+    
+    # A series whose occurrences all fit the horizon is complete and never due again
+    short = client.post(
+        "/booking-series",
+        headers=headers,
+        json={**series_json, "start_time": (start_time + timedelta(hours=2)).isoformat(), "count": 2}
+    )
+    assert short.json()["materialized_until"] == datetime.max.isoformat()
+    
+    # Reads book nothing; the scheduled materialize run rolls the horizon forward
+    monkeypatch.setattr(settings, "SERIES_HORIZON_DAYS", 60)
+    client.get(f"/booking-series/{series_id}", headers=headers)
+    assert len(series_bookings()) == 4
+    admin_headers = {"Authorization": f"Bearer {get_token('admin@example.com', 'admin123')}"}
+    response = client.post("/booking-series/materialize", headers=admin_headers)
+    assert response.json() == {"series": 1, "bookings_created": 5}
+    assert len(series_bookings()) == 9
+    
+    response = client.delete(f"/booking-series/{series_id}", headers=headers)
+    assert response.status_code == 204
+    assert {booking.status.value for booking in series_bookings()} == {"cancelled"}
+
+
 def test_get_user_bookings(test_user, test_service):
     """Test getting user's own bookings"""
     token = get_token("test@example.com", "password123")
@@ -388,7 +1106,7 @@ def test_get_user_bookings(test_user, test_service):
     )
     assert response.status_code == 200
     data = response.json()
-    assert len(data) > 0
+    assert len(data["items"]) > 0
 
 
 def test_admin_sees_all_bookings(test_user, test_admin, test_service):
@@ -413,7 +1131,235 @@ def test_admin_sees_all_bookings(test_user, test_admin, test_service):
         headers={"Authorization": f"Bearer {admin_token}"}
     )
     assert response.status_code == 200
-    assert len(response.json()) > 0
+    assert len(response.json()["items"]) > 0
+
+
+def test_get_bookings_paginated(test_user, test_service):
+    """Test bookings are paged newest first using keyset cursors"""
+    token = get_token("test@example.com", "password123")
+    base_time = datetime.utcnow() + timedelta(days=1)
+    for i in range(3):
+        client.post(
+            "/bookings",
+            headers={"Authorization": f"Bearer {token}"},
+            json={
+                "service_id": test_service.id,
+                "start_time": (base_time + timedelta(hours=2 * i)).isoformat()
+            }
+        )
+    
+    first_page = client.get(
+        "/bookings",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"limit": 2}
+    ).json()
+    assert len(first_page["items"]) == 2
+    assert first_page["next_cursor"] is not None
+    
+    second_page = client.get(
+        "/bookings",
+        headers={"Authorization": f"Bearer {token}"},
+        params={"limit": 2, "cursor": first_page["next_cursor"]}
+    ).json()
+    assert len(second_page["items"]) == 1
+    assert second_page["next_cursor"] is None
+    
+    start_times = [item["start_time"] for item in first_page["items"] + second_page["items"]]
+    assert start_times == sorted(start_times, reverse=True)
+
+
+def test_export_bookings_streams_ndjson_and_csv(test_user, test_admin, test_service):
+    """Test admins can export every booking as NDJSON or CSV, oldest first"""
+    create_bookings(test_user.id, test_service.id, 5)
+    admin_token = get_token("admin@example.com", "admin123")
+    user_token = get_token("test@example.com", "password123")
+    
+    response = client.get("/bookings/export", headers={"Authorization": f"Bearer {admin_token}"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert len(rows) == 5
+    assert rows[0]["status"] == "pending"
+    assert [row["start_time"] for row in rows] == sorted(row["start_time"] for row in rows)
+    
+    response = client.get(
+        "/bookings/export",
+        headers={"Authorization": f"Bearer {admin_token}"},
+        params={"format": "csv", "status": "pending"}
+    )
+    assert response.headers["content-type"].startswith("text/csv")
+    lines = response.text.splitlines()
+    assert lines[0] == "id,user_id,service_id,start_time,end_time,status,created_at"
+    assert len(lines) == 6
+    
+    response = client.get("/bookings/export", headers={"Authorization": f"Bearer {user_token}"})
+    assert response.status_code == 403
+
+
+def test_writes_do_not_reload_rows(test_user, test_admin, test_service):
+    """Test creates and updates return generated columns without a SELECT after the write"""
+    user_headers = {"Authorization": f"Bearer {get_token('test@example.com', 'password123')}"}
+    admin_headers = {"Authorization": f"Bearer {get_token('admin@example.com', 'admin123')}"}
+    start_time = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    
+    writes = [
+        ("POST", "/bookings", user_headers, {"service_id": test_service.id, "start_time": start_time}, "INSERT INTO bookings"),
+        ("PATCH", f"/services/{test_service.id}", admin_headers, {"price": 60.0}, "UPDATE services"),
+        ("PATCH", "/me", user_headers, {"name": "Renamed"}, "UPDATE users"),
+    ]
+    for method, url, headers, body, write in writes:
+        with count_queries() as statements:
+            response = client.request(method, url, headers=headers, json=body)
+        assert response.status_code in (200, 201)
+        assert response.json()["id"] and response.json()["created_at"]
+        assert statements[-1].startswith(write), statements
+    
+    booking = client.get("/bookings", headers=user_headers).json()["items"][0]
+    assert booking["service"]["price"] == 60.0
+    with count_queries() as statements:
+        response = client.patch(f"/bookings/{booking['id']}", headers=admin_headers, json={"status": "completed"})
+    assert response.json()["service"]["id"] == test_service.id
+    assert statements[-1].startswith("UPDATE bookings")
+    
+    with count_queries() as statements:
+        response = client.post("/reviews", headers=user_headers, json={"booking_id": booking["id"], "rating": 5, "comment": "Great"})
+    assert response.status_code == 201
+    assert response.json()["id"]
+    assert not statements[-1].startswith("SELECT")
+
+
+def test_update_booking_is_one_transaction(test_user, test_service):
+    """Test a multi-step booking update commits once and a failing step undoes the earlier ones"""
+    token = get_token("test@example.com", "password123")
+    headers = {"Authorization": f"Bearer {token}"}
+    start_time = datetime.utcnow() + timedelta(days=1)
+    booking_id = client.post(
+        "/bookings",
+        headers=headers,
+        json={"service_id": test_service.id, "start_time": start_time.isoformat()}
+    ).json()["id"]
+    
+    commits = []
+    
+    def on_commit(conn):
+        commits.append(conn)
+    
+    event.listen(async_engine.sync_engine, "commit", on_commit)
+    try:
+        # Rescheduling is allowed, confirming is not: the reschedule must not stick
+        response = client.patch(
+            f"/bookings/{booking_id}",
+            headers=headers,
+            json={"start_time": (start_time + timedelta(days=1)).isoformat(), "status": "confirmed"}
+        )
+        assert response.status_code == 403
+        assert client.get(f"/bookings/{booking_id}", headers=headers).json()["start_time"] == start_time.isoformat()
+        
+        commits.clear()
+        response = client.patch(
+            f"/bookings/{booking_id}",
+            headers=headers,
+            json={"start_time": (start_time + timedelta(days=2)).isoformat(), "status": "cancelled"}
+        )
+        assert response.json()["status"] == "cancelled"
+        assert len(commits) == 1
+    finally:
+        event.remove(async_engine.sync_engine, "commit", on_commit)
+
+
+def test_get_bookings_query_count_is_constant(test_user, test_service):
+    """Test listing bookings does not lazy load each booking's service"""
+    token = get_token("test@example.com", "password123")
+    headers = {"Authorization": f"Bearer {token}"}
+    client.get("/me", headers=headers)
+    
+    create_bookings(test_user.id, test_service.id, 1)
+    with count_queries() as few:
+        response = client.get("/bookings", headers=headers)
+    assert len(response.json()["items"]) == 1
+    
+    create_bookings(test_user.id, test_service.id, 10)
+    with count_queries() as many:
+        response = client.get("/bookings", headers=headers)
+    assert len(response.json()["items"]) == 11
+    assert all(item["service"]["id"] == test_service.id for item in response.json()["items"])
+    
+    # The current user is cached; bookings are joined to services in one query
+    assert len(few) == len(many) == 1
+
+
+def test_conflict_benchmark_runs(tmp_path):
+    """Test the conflict benchmark still seeds and runs, on a small throwaway database"""
+    result = subprocess.run(
+        [sys.executable, os.path.join(os.path.dirname(__file__), "..", "benchmarks", "check_conflict.py"),
+         "--sizes", "100", "--iterations", "5"],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "DATABASE_URL": f"sqlite:///{tmp_path / 'bench.db'}", "ASYNC_DATABASE_URL": ""}
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_hot_queries_reuse_one_statement_per_shape():
+    """Test hot queries are built once per shape and match the same queries built ad hoc"""
+    start_time = datetime.utcnow()
+    query, params = conflict_statement(1, start_time, start_time + timedelta(hours=1))
+    assert conflict_statement(2, start_time, start_time + timedelta(hours=2))[0] is query
+    assert conflict_statement(1, start_time, start_time + timedelta(hours=1), exclude_booking_id=3)[0] is not query
+    assert conflict_statement(1, start_time, start_time + timedelta(hours=1), disjoint=True)[0] is not query
+    assert params == {"service_id": 1, "start_time": start_time, "end_time": start_time + timedelta(hours=1)}
+    assert booking_page_statement(user_id=1)[0] is booking_page_statement(user_id=2, limit=5)[0]
+    
+    result = subprocess.run(
+        [sys.executable, os.path.join(os.path.dirname(__file__), "..", "benchmarks", "statement_cache.py"), "--iterations", "20"],
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_list_projections_match_orm_responses(test_user, test_service):
+    """Test list endpoints answer from column projections exactly as from entities"""
+    token = get_token("test@example.com", "password123")
+    create_bookings(test_user.id, test_service.id, 3)
+    db = TestingSessionLocal()
+    bookings = db.query(Booking).order_by(Booking.start_time.desc(), Booking.id.desc()).all()
+    expected_bookings = [json.loads(BookingResponse.model_validate(booking).model_dump_json()) for booking in bookings]
+    expected_services = [json.loads(ServiceResponse.model_validate(service).model_dump_json()) for service in db.query(Service)]
+    db.close()
+    
+    first = client.get("/bookings?limit=2", headers={"Authorization": f"Bearer {token}"}).json()
+    rest = client.get(
+        f"/bookings?limit=2&cursor={first['next_cursor']}",
+        headers={"Authorization": f"Bearer {token}"}
+    ).json()
+    assert first["items"] + rest["items"] == expected_bookings
+    assert rest["next_cursor"] is None
+    assert client.get("/services").json()["items"] == expected_services
+    
+    result = subprocess.run(
+        [sys.executable, os.path.join(os.path.dirname(__file__), "..", "benchmarks", "list_projection.py"),
+         "--rows", "200", "--repeats", "1"],
+        capture_output=True,
+        text=True
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
+
+
+def test_delete_booking(test_user, test_service):
+    """Test owner deleting a future booking"""
+    token = get_token("test@example.com", "password123")
+    create_bookings(test_user.id, test_service.id, 1)
+    booking_id = client.get(
+        "/bookings",
+        headers={"Authorization": f"Bearer {token}"}
+    ).json()["items"][0]["id"]
+    
+    response = client.delete(
+        f"/bookings/{booking_id}",
+        headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 204
 
 
 def test_user_cannot_access_other_booking(test_user, test_admin, test_service):
@@ -441,6 +1387,59 @@ def test_user_cannot_access_other_booking(test_user, test_admin, test_service):
     assert response.status_code == 403
 
 
+def test_reschedule_booking(test_user, test_service):
+    """Test owner rescheduling a booking returns the embedded service"""
+    token = get_token("test@example.com", "password123")
+    start_time = datetime.utcnow() + timedelta(days=1)
+    booking_response = client.post(
+        "/bookings",
+        headers={"Authorization": f"Bearer {token}"},
+        json={
+            "service_id": test_service.id,
+            "start_time": start_time.isoformat()
+        }
+    )
+    booking_id = booking_response.json()["id"]
+    
+    response = client.patch(
+        f"/bookings/{booking_id}",
+        headers={"Authorization": f"Bearer {token}"},
+        json={"start_time": (start_time + timedelta(days=1)).isoformat()}
+    )
+    assert response.status_code == 200
+    data = response.json()
+    assert data["service"]["id"] == test_service.id
+    assert data["end_time"] == (start_time + timedelta(days=1, minutes=60)).isoformat()
+
+
+def test_delete_service_with_bookings(test_user, test_admin, test_service):
+    """Test deleting a service cascades to its bookings"""
+    user_token = get_token("test@example.com", "password123")
+    admin_token = get_token("admin@example.com", "admin123")
+    start_time = (datetime.utcnow() + timedelta(days=1)).isoformat()
+    booking_response = client.post(
+        "/bookings",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={
+            "service_id": test_service.id,
+            "start_time": start_time
+        }
+    )
+    booking_id = booking_response.json()["id"]
+    
+    response = client.delete(
+        f"/services/{test_service.id}",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 204
+    
+    response = client.get(
+        f"/bookings/{booking_id}",
+        headers={"Authorization": f"Bearer {admin_token}"}
+    )
+    assert response.status_code == 404
+
+
 # ===== REVIEW TESTS =====
 
 def test_create_review_for_completed_booking(test_user, test_service, test_admin):
@@ -483,6 +1482,51 @@ def test_create_review_for_completed_booking(test_user, test_service, test_admin
     assert data["comment"] == "Great service!"
 
 
+def test_service_rating_aggregates(test_user, test_service, test_admin):
+    """Test review writes keep service rating aggregates and rating order current"""
+    user_token = get_token("test@example.com", "password123")
+    admin_token = get_token("admin@example.com", "admin123")
+    create_bookings(test_user.id, test_service.id, 3)
+    db = TestingSessionLocal()
+    booking_ids = [booking.id for booking in db.query(Booking).order_by(Booking.id)]
+    db.query(Booking).update({"status": "COMPLETED"})
+    db.add(Service(title="Unrated", description="No reviews", price=10.0, duration_minutes=30))
+    db.commit()
+    db.close()
+    
+    review_ids = [
+        client.post(
+            "/reviews",
+            headers={"Authorization": f"Bearer {user_token}"},
+            json={"booking_id": booking_id, "rating": rating, "comment": "Review"}
+        ).json()["id"]
+        for booking_id, rating in zip(booking_ids, (5, 4, 2))
+    ]
+    client.patch(
+        f"/reviews/{review_ids[2]}",
+        headers={"Authorization": f"Bearer {user_token}"},
+        json={"rating": 3}
+    )
+    client.delete(f"/reviews/{review_ids[0]}", headers={"Authorization": f"Bearer {user_token}"})
+    
+    data = client.get(f"/services/{test_service.id}").json()
+    assert data["rating_count"] == 2
+    assert data["rating_average"] == 3.5
+    assert data["rating_histogram"] == {"1": 0, "2": 0, "3": 1, "4": 1, "5": 0}
+    
+    # Deleting a reviewed booking removes its review from the aggregates
+    client.delete(f"/bookings/{booking_ids[1]}", headers={"Authorization": f"Bearer {admin_token}"})
+    data = client.get(f"/services/{test_service.id}").json()
+    assert (data["rating_count"], data["rating_average"]) == (1, 3.0)
+    
+    response = client.get("/services", params={"sort": "rating", "limit": 1})
+    assert response.json()["items"][0]["title"] == "Test Service"
+    response = client.get("/services", params={"sort": "rating", "cursor": response.json()["next_cursor"]})
+    assert [item["title"] for item in response.json()["items"]] == ["Unrated"]
+    response = client.get("/services", params={"min_rating": 3})
+    assert [item["title"] for item in response.json()["items"]] == ["Test Service"]
+
+
 def test_cannot_review_non_completed_booking(test_user, test_service):
     """Test cannot review pending booking"""
     token = get_token("test@example.com", "password123")
@@ -516,4 +1560,4 @@ def test_get_service_reviews(test_service):
     """Test getting reviews for a service"""
     response = client.get(f"/services/{test_service.id}/reviews")
     assert response.status_code == 200
-    assert isinstance(response.json(), list)
\ No newline at end of file
+    assert isinstance(response.json()["items"], list)
\ No newline at end of file